@@ -3,47 +3,167 @@ This module is meant to be a collection of tools to simplify common task in AV c
 Started: March 28, 2017 and appended to continuously
 '''
 
-try:
-    from extronlib.system import ProgramLog, File
-    from extronlib.interface import EthernetServerInterfaceEx
-    from extronlib import event
-except:
-    pass
-import uuid
-
-# dont do try/except to import extronlib
-# for some reason it was giving me trouble with extronlib_clone, but commenting it out seems to fix it
-# try:
-#     from extronlib.system import ProgramLog, File
-#     from extronlib.interface import EthernetServerInterfaceEx
-#     from extronlib import event
-# except Exception as e:
-#     print('gs_tools Exception 11:', e)
-
-try:
-    from extronlib_pro import Wait
-except:
-    try:
-        from extronlib.system import Wait
-    except:
-        pass
-
-try:
-    import aes_tools
-except:
-    pass
-
+import sys
 import time
-import hashlib
-import calendar
-import random
-import json
 import itertools
 import re
-import datetime
-import uuid
-import binascii
-from collections import defaultdict
+import threading
+import atexit
+import functools
+import bisect
+import importlib
+import heapq
+import math
+from array import array
+from collections import defaultdict, deque
+
+
+# Lazy imports ******************************************************************
+# Startup time matters on a processor reboot, so the extronlib names and the heavier std modules
+# are only imported the first time they are used.
+
+class _LazyModule:
+    '''
+    Stands in for a module until one of its attributes is used.
+    Then the module is imported and replaces this object in the gs_tools namespace.
+    The proxies are private (_json, _datetime, ...) so "from gs_tools import *" never hands one out.
+    '''
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        globals()['_' + self._name] = module
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return '<lazy module {}>'.format(self._name)
+
+
+class _LazyExtronName:
+    '''
+    Stands in for an extronlib function/class (like ProgramLog or Wait) until it is used.
+    Then it is imported from the first module that has it and replaces this object in the gs_tools namespace.
+    The proxies are private (_ProgramLog, _Wait, ...), the public names are resolved by __getattr__() on first lookup.
+    '''
+
+    def __init__(self, name, *moduleNames):
+        self._name = name
+        self._moduleNames = moduleNames
+        self._obj = None
+
+    def Resolve(self):
+        if self._obj is None:
+            for moduleName in self._moduleNames:
+                try:
+                    self._obj = getattr(importlib.import_module(moduleName), self._name)
+                    break
+                except (ImportError, AttributeError):
+                    pass
+            else:
+                raise ImportError('{} could not be imported from {}'.format(self._name, self._moduleNames))
+
+            globals()['_' + self._name] = self._obj
+            globals()[self._name] = self._obj
+        return self._obj
+
+    @property
+    def Available(self):
+        try:
+            self.Resolve()
+            return True
+        except ImportError:
+            return False
+
+    def __call__(self, *args, **kwargs):
+        return self.Resolve()(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        return getattr(self.Resolve(), attr)
+
+    def __mro_entries__(self, bases):
+        # class MyFile(_File) subclasses the real class
+        return (self.Resolve(),)
+
+    def __repr__(self):
+        return '<lazy {} from {}>'.format(self._name, ' or '.join(self._moduleNames))
+
+
+_ProgramLog = _LazyExtronName('ProgramLog', 'extronlib.system')
+_File = _LazyExtronName('File', 'extronlib.system')
+_EthernetServerInterfaceEx = _LazyExtronName('EthernetServerInterfaceEx', 'extronlib.interface')
+_event = _LazyExtronName('event', 'extronlib')
+_Wait = _LazyExtronName('Wait', 'extronlib_pro', 'extronlib.system')
+
+_asyncio = _LazyModule('asyncio')
+_binascii = _LazyModule('binascii')
+_codecs = _LazyModule('codecs')
+_calendar = _LazyModule('calendar')
+_csv = _LazyModule('csv')
+_datetime = _LazyModule('datetime')
+_hashlib = _LazyModule('hashlib')
+_json = _LazyModule('json')
+_os = _LazyModule('os')
+_random = _LazyModule('random')
+_secrets = _LazyModule('secrets')
+_uuid = _LazyModule('uuid')
+
+# modules that gs_tools always exported, still available as gs_tools.json etc. and from "import *"
+_PUBLIC_LAZY_MODULES = ('binascii', 'calendar', 'datetime', 'hashlib', 'json', 'random', 'uuid')
+
+_LAZY_ATTRIBUTES = {
+    # 'name': function that returns the value, for module attributes that are built on first access
+}
+
+
+def __getattr__(name):
+    # PEP 562, called for gs_tools.<name> when name is not in the module namespace (python 3.7+)
+    if name == 'aes_tools':
+        try:
+            globals()[name] = importlib.import_module(name)
+        except ImportError:
+            raise AttributeError('module {} has no attribute {}'.format(__name__, name))
+        return globals()[name]
+
+    if name in _PUBLIC_LAZY_MODULES:
+        globals()[name] = importlib.import_module(name)
+        return globals()[name]
+
+    lazyName = globals().get('_' + name)
+    if isinstance(lazyName, _LazyExtronName):
+        try:
+            return lazyName.Resolve()
+        except ImportError:
+            raise AttributeError('module {} has no attribute {}'.format(__name__, name))
+
+    if name in _LAZY_ATTRIBUTES:
+        globals()[name] = _LAZY_ATTRIBUTES.pop(name)()
+        return globals()[name]
+
+    if name == '__all__':
+        # only built when someone does "from gs_tools import *", so a plain import stays lazy
+        globals()[name] = _BuildAll()
+        return globals()[name]
+
+    raise AttributeError('module {} has no attribute {}'.format(__name__, name))
+
+
+def _BuildAll():
+    # every public name, plus the lazy ones that are available
+    names = [name for name, value in globals().items()
+             if not name.startswith('_') and not isinstance(value, type(sys))]
+    names.extend(('time', 'itertools', 're'))
+    lazyNames = list(_PUBLIC_LAZY_MODULES) + list(_LAZY_ATTRIBUTES)
+    lazyNames.extend(('aes_tools', 'ProgramLog', 'File', 'EthernetServerInterfaceEx', 'event', 'Wait'))
+    for name in lazyNames:
+        try:
+            __getattr__(name)
+            names.append(name)
+        except AttributeError:
+            pass
+    return sorted(set(names))
+
 
 # Set this false to disable all print statements ********************************
 debug = False
@@ -55,51 +175,202 @@ if debug is False:
 
 
 # Helpful functions *************************************************************
+SHORTEN_TEXT_ABBREVIATIONS = {
+    # Use AddAbbreviations() to add more, so the compiled pattern and cache are refreshed
+    'Lectern': 'Lect',
+    'Quantum': 'Qtm',
+    'Projector': 'Proj',
+    'Confidence': 'Conf',
+    'Monitor': 'Mon',
+    'Left': 'L',
+    'Right': 'R',
+    'Program': 'Pgm',
+    'Annotator': 'Antr',
+    'Preview': 'Prev',
+    'From': 'Frm',
+    'Display': 'Disp',
+    'Audio': 'Aud',
+    'Wireless': 'Wless',
+    'Handheld': 'HH',
+    'Floorbox': 'FlrBx',
+    'Laptop': 'Lap',
+}
+
+_shortenTextRegex = None
+
+
+def AddAbbreviations(abbreviations):
+    '''
+    Adds to the abbreviations used by ShortenText()
+    Example: AddAbbreviations({'Camera': 'Cam', 'Document': 'Doc'})
+    :param abbreviations: dict like {'Long Word': 'Short'}
+    '''
+    global _shortenTextRegex
+    SHORTEN_TEXT_ABBREVIATIONS.update(abbreviations)
+    _shortenTextRegex = None
+    ShortenText.cache_clear()
+
+
+def _Abbreviate(text):
+    global _shortenTextRegex
+    if _shortenTextRegex is None:
+        # longest first so 'Wireless' is matched before any shorter word inside it
+        words = sorted(SHORTEN_TEXT_ABBREVIATIONS, key=len, reverse=True)
+        _shortenTextRegex = re.compile('|'.join(re.escape(word) for word in words))
+
+    return _shortenTextRegex.sub(lambda match: SHORTEN_TEXT_ABBREVIATIONS[match.group(0)], text)
+
+
+def _WrapText(text, MaxLength, LineNums):
+    # Greedy word wrap, the last line gets all remaining words
+    words = text.split()
+    lines = []
+    start = 0
+    for _ in range(LineNums - 1):
+        if start >= len(words):
+            break
+
+        end = start + 1
+        length = len(words[start])
+        while end < len(words) and length + 1 + len(words[end]) <= MaxLength:
+            length += 1 + len(words[end])
+            end += 1
+
+        lines.append(' '.join(words[start:end]))
+        start = end
+
+    if start < len(words):
+        lines.append(' '.join(words[start:]))
+
+    return '\n'.join(lines)
+
+
+@functools.lru_cache(maxsize=1024)
 def ShortenText(text, MaxLength=7, LineNums=2):
-    text = text.replace('Lectern', 'Lect')
-    text = text.replace('Quantum', 'Qtm')
-    text = text.replace('Projector', 'Proj')
-    text = text.replace('Confidence', 'Conf')
-    text = text.replace('Monitor', 'Mon')
-    text = text.replace('Left', 'L')
-    text = text.replace('Right', 'R')
-    text = text.replace('Program', 'Pgm')
-    text = text.replace('Annotator', 'Antr')
-    text = text.replace('Preview', 'Prev')
-    text = text.replace('From', 'Frm')
-    text = text.replace('Display', 'Disp')
-    text = text.replace('Audio', 'Aud')
-    text = text.replace('Wireless', 'Wless')
-    text = text.replace('Handheld', 'HH')
-    text = text.replace('Display', 'Disp')
-    text = text.replace('Floorbox', 'FlrBx')
-    text = text.replace('Laptop', 'Lap')
+    '''
+    Abbreviates common AV words (see SHORTEN_TEXT_ABBREVIATIONS) and wraps the text to fit a button
+    Example: ShortenText('Wireless Handheld Mic') >>> 'Wless\nHH Mic'
+    :param text: str
+    :param MaxLength: int, max characters per line
+    :param LineNums: int, max number of lines
+    :return: str
+    '''
+    text = _Abbreviate(text)
 
     if len(text) > MaxLength:
         text = text[:MaxLength * LineNums]
-        textSplit = text.split()
-        if len(textSplit) > 0:
-            NewText = ''
-            while True:
-                if len(textSplit) > 0:
-                    if len(NewText) + len(' ') + len(textSplit[0]) <= MaxLength:
-                        NewText += ' ' + textSplit.pop(0)
-                    else:
-                        break
-                else:
-                    break
-            NewText += '\n'
-            NewText += ' '.join(textSplit)
-            text = NewText
+        text = _WrapText(text, MaxLength, LineNums)
 
     return text
 
 
-def PrintProgramLog():
+def ShortenTextMany(texts, MaxLength=7, LineNums=2):
+    # Batch version of ShortenText(), useful for labelling all the buttons on a page
+    return [ShortenText(text, MaxLength, LineNums) for text in texts]
+
+
+class FileLogSink:
+    '''
+    A log sink that appends to a local file.
+    Useful for testing PrintProgramLog() when extronlib is not available.
+    '''
+
+    def __init__(self, path='ProgramLog.log'):
+        self.Path = path
+
+    def __call__(self, text, severity='info'):
+        with open(self.Path, mode='at') as file:
+            file.write('{}: {}'.format(severity, text))
+
+
+def _DefaultLogSink():
+    sink = _ProgramLog
+    if isinstance(sink, _LazyExtronName) and not sink.Available:
+        sink = FileLogSink()
+    return sink
+
+
+def _CoalesceRecords(records):
+    # Empties the deque of (text, severity) records, yielding consecutive records with the same severity joined together
+    lastSeverity = None
+    lines = []
+    try:
+        while True:
+            text, severity = records.popleft()
+            if severity != lastSeverity and lines:
+                yield ''.join(lines), lastSeverity
+                lines = []
+            lines.append(text)
+            lastSeverity = severity
+    except IndexError:
+        pass
+
+    if lines:
+        yield ''.join(lines), lastSeverity
+
+
+class ProgramLogWriter:
+    '''
+    Collects log records in a deque and writes them from a background thread.
+    Consecutive records with the same severity are joined and written with a single sink call.
+    The queue is flushed every flushInterval seconds, when it reaches highWaterMark records, and on exit.
+    '''
+
+    def __init__(self, sink=None, flushInterval=1, highWaterMark=500):
+        '''
+        :param sink: callable(text, severity), defaults to ProgramLog, or FileLogSink() if extronlib is not available
+        :param flushInterval: float, seconds
+        :param highWaterMark: int, number of queued records that will trigger an immediate flush
+        '''
+        self.Sink = sink or _DefaultLogSink()
+        self.FlushInterval = flushInterval
+        self.HighWaterMark = highWaterMark
+
+        self._records = deque()  # [(text, severity), ...]
+        self._flushLock = threading.Lock()
+        self._wakeEvent = threading.Event()
+        self._thread = threading.Thread(target=self._FlushLoop, daemon=True)
+        self._thread.start()
+        atexit.register(self.Flush)
+
+    def Write(self, text, severity='info'):
+        self._records.append((text, severity))
+        if len(self._records) >= self.HighWaterMark:
+            self._wakeEvent.set()
+
+    def Flush(self):
+        with self._flushLock:
+            for text, severity in _CoalesceRecords(self._records):
+                try:
+                    self.Sink(text, severity)
+                except Exception as e:
+                    oldPrint('ProgramLogWriter Error:', e)
+
+    def _FlushLoop(self):
+        while True:
+            self._wakeEvent.wait(self.FlushInterval)
+            self._wakeEvent.clear()
+            self.Flush()
+
+
+def PrintProgramLog(asynchronous=False, sink=None, flushInterval=1, highWaterMark=500):
     """usage:
    print = PrintProgramLog()
+
+   If asynchronous is True, the print function only queues the text and a ProgramLogWriter writes it in batches.
+   print = PrintProgramLog(asynchronous=True)
+   print = PrintProgramLog(asynchronous=True, sink=FileLogSink('debug.log'))  # without extronlib
    """
+    if asynchronous:
+        write = ProgramLogWriter(sink, flushInterval, highWaterMark).Write
+    else:
+        write = sink or _DefaultLogSink()
+
+    return _MakeLogPrint(write)
 
+
+def _MakeLogPrint(write):
+    # returns a print function that sends its text to write(text, severity)
     def print(*args, sep=' ', end='\n', severity='info',
               **kwargs):  # override the print function to write to program log instead
         # Following is done to emulate behavior Python's print keyword arguments
@@ -113,45 +384,150 @@ def PrintProgramLog():
         string = []
         for arg in args:
             string.append(str(arg))
-        ProgramLog(sep.join(string) + end, severity)
+        write(sep.join(string) + end, severity)
 
     return print
 
 
 RemoteTraceServer = None
+RemoteTraceBuffer = None
+
+
+class _TraceClientQueue:
+    # The bounded line queue and flusher thread for one client of a TraceBuffer
+
+    def __init__(self, client, bufferSize, flushInterval):
+        self.Client = client
+        self.FlushInterval = flushInterval
+        self.Lines = deque(maxlen=bufferSize)
+
+        self._stopEvent = threading.Event()
+        self._thread = threading.Thread(target=self._FlushLoop, daemon=True)
+        self._thread.start()
+
+    def Flush(self):
+        lines = []
+        try:
+            while True:
+                lines.append(self.Lines.popleft())
+        except IndexError:
+            pass
+
+        if lines:
+            try:
+                self.Client.Send(''.join(lines))
+            except Exception as e:
+                _ProgramLog('TraceBuffer.Flush Error: {}'.format(e), 'error')
+
+    def _FlushLoop(self):
+        while not self._stopEvent.wait(self.FlushInterval):
+            self.Flush()
+
+    def Stop(self):
+        self._stopEvent.set()
 
 
-def RemoteTrace(IPPort=1024):
+class TraceBuffer:
+    '''
+    Holds a bounded queue of trace lines for each connected client.
+    Each queue is drained by a background thread every flushInterval seconds and the lines are sent in one batch,
+        so a slow client only delays itself.
+    When a client's queue is full, the oldest line is dropped and counted in Drops.
+    '''
+
+    def __init__(self, server, bufferSize=1000, flushInterval=0.1):
+        '''
+        :param server: EthernetServerInterfaceEx (or anything with a .Clients list of objects with a .Send() method)
+        :param bufferSize: int, max number of lines held per client
+        :param flushInterval: float, seconds between flushes
+        '''
+        self.Server = server
+        self.BufferSize = bufferSize
+        self.FlushInterval = flushInterval
+        self.Drops = defaultdict(int)  # {client: int(numOfDroppedLines)}
+
+        self._queues = {}  # {client: _TraceClientQueue}
+
+    @property
+    def TotalDrops(self):
+        return sum(self.Drops.values())
+
+    def Write(self, string):
+        # Called from the caller's thread, never blocks on a client
+        clients = self.Server.Clients
+        if len(self._queues) > len(clients):
+            self._RemoveDisconnected(clients)
+
+        for client in clients:
+            q = self._queues.get(client)
+            if q is None:
+                q = self._queues[client] = _TraceClientQueue(client, self.BufferSize, self.FlushInterval)
+
+            if len(q.Lines) == self.BufferSize:
+                self.Drops[client] += 1
+            q.Lines.append(string)
+
+    def _RemoveDisconnected(self, clients):
+        for client in list(self._queues):
+            if client not in clients:
+                self._queues.pop(client).Stop()
+                self.Drops.pop(client, None)
+
+    def Flush(self):
+        for q in list(self._queues.values()):
+            q.Flush()
+
+    def Stop(self):
+        for q in self._queues.values():
+            q.Stop()
+        self._queues.clear()
+
+
+def RemoteTrace(IPPort=1024, buffered=False, bufferSize=1000, flushInterval=0.1):
     '''
     This function return a new print function that will print to stdout and also send to any clients connected to the server defined on port IPPort
     For example:
         print = RemoteTrace()
+
+    If buffered is True, the lines are queued for each client and sent by a background thread (see TraceBuffer),
+        so a slow client cannot stall the caller.
+        Dropped line counts are available from gs_tools.RemoteTraceBuffer.Drops
     :param IPPort: int
+    :param buffered: bool
+    :param bufferSize: int, max lines queued per client when buffered
+    :param flushInterval: float, seconds between sends when buffered
     :return:
     '''
     global RemoteTraceServer
+    global RemoteTraceBuffer
 
     # Start a new server
     if RemoteTraceServer == None:
-        RemoteTraceServer = EthernetServerInterfaceEx(IPPort)
+        RemoteTraceServer = _EthernetServerInterfaceEx(IPPort)
 
-        @event(RemoteTraceServer, ['Connected', 'Disconnected'])
+        @_event(RemoteTraceServer, ['Connected', 'Disconnected'])
         def RemoteTraceServerConnectEvent(client, state):
             print('Client {}:{} {}'.format(client.IPAddress, client.ServicePort, state))
 
         result = RemoteTraceServer.StartListen()
-        ProgramLog('RemoteTraceServer {}'.format(result), 'info')
+        _ProgramLog('RemoteTraceServer {}'.format(result), 'info')
+
+    if buffered and RemoteTraceBuffer is None:
+        RemoteTraceBuffer = TraceBuffer(RemoteTraceServer, bufferSize, flushInterval)
 
     def NewPrint(*args):  # override the print function to write to program log instead
         try:
             oldPrint(*args)
             string = '\r\n' + str(time.monotonic()) + ': ' + ' '.join(str(arg) for arg in args)
 
-            for client in RemoteTraceServer.Clients:
-                client.Send(string + '\r\n')
-                # ProgramLog(string, 'info')
+            if buffered:
+                RemoteTraceBuffer.Write(string + '\r\n')
+            else:
+                for client in RemoteTraceServer.Clients:
+                    client.Send(string + '\r\n')
+                    # ProgramLog(string, 'info')
         except Exception as e:
-            ProgramLog(str(e), 'error')
+            _ProgramLog(str(e), 'error')
 
     return NewPrint
 
@@ -185,6 +561,136 @@ def ToPercent(Value, Min=0, Max=100):
         return 0
 
 
+def IPv4ToInt(IP):
+    '''
+    Example '192.168.254.254' > 3232300798
+    Raises ValueError if IP is not a valid IPv4, see IsValidIPv4()
+    :param IP: str like '192.168.254.254'
+    :return: int
+    '''
+    if not isinstance(IP, str) or _IPV4_RE.fullmatch(IP) is None:
+        raise ValueError('{} is not a valid IPv4'.format(repr(IP)))
+    a, b, c, d = IP.split('.')
+    return (int(a) << 24) | (int(b) << 16) | (int(c) << 8) | int(d)
+
+
+def IntToIPv4(num):
+    '''
+    Example 3232300798 > '192.168.254.254'
+    :param num: int from 0 to 0xFFFFFFFF
+    :return: str like '192.168.254.254'
+    '''
+    return '{}.{}.{}.{}'.format(num >> 24 & 0xFF, num >> 16 & 0xFF, num >> 8 & 0xFF, num & 0xFF)
+
+
+class IPv4Range:
+    '''
+    A sequence of IPv4 addresses backed by a range() of 32-bit ints.
+    Addresses are only formatted as strings when they are accessed, and len(), in, indexing and slicing are O(1).
+
+    Examples:
+        IPv4Range('192.168.1.0/24') > 192.168.1.0 thru 192.168.1.255
+        IPv4Range('192.168.1.10', '192.168.1.20') > 192.168.1.10 thru 192.168.1.20 (inclusive)
+        IPv4Range('10.0.0.0', 16) > 10.0.0.0 thru 10.0.255.255
+        IPv4Range('10.0.0.0/16', step=256) > 10.0.0.0, 10.0.1.0, 10.0.2.0 ...
+
+        '10.0.3.7' in IPv4Range('10.0.0.0/16') > True
+    '''
+
+    def __init__(self, start, end_or_cidr=None, step=1):
+        '''
+        :param start: str like '192.168.1.0' or '192.168.1.0/24', or an int
+        :param end_or_cidr: str like '192.168.1.254' (inclusive), or int prefix length like 24.
+            If None, start must include a '/prefix' or the range will only contain start
+        :param step: int, a negative step with a prefix length goes from the last address down to the first
+        '''
+        if isinstance(start, range):
+            # used internally when slicing
+            self._range = start
+            return
+
+        if isinstance(start, str) and '/' in start:
+            start, end_or_cidr = start.split('/')
+            end_or_cidr = int(end_or_cidr)
+
+        if isinstance(start, int):
+            if not 0 <= start <= 0xFFFFFFFF:
+                raise ValueError('{} is not a 32-bit IPv4 int'.format(start))
+            startInt = start
+        else:
+            startInt = IPv4ToInt(start)
+
+        if end_or_cidr is None:
+            lastInt = startInt
+
+        elif isinstance(end_or_cidr, int):
+            if not 0 <= end_or_cidr <= 32:
+                raise ValueError('Invalid prefix length {}'.format(end_or_cidr))
+            hostMask = (1 << (32 - end_or_cidr)) - 1
+            startInt &= ~hostMask & 0xFFFFFFFF
+            lastInt = startInt + hostMask
+            if step < 0:
+                startInt, lastInt = lastInt, startInt
+
+        else:
+            lastInt = IPv4ToInt(end_or_cidr)
+
+        self._range = range(startInt, lastInt + (1 if step > 0 else -1), step)
+
+    def _ToInt(self, ip):
+        if isinstance(ip, int):
+            return ip
+        try:
+            return IPv4ToInt(ip)
+        except (ValueError, AttributeError):
+            return None
+
+    def __len__(self):
+        return len(self._range)
+
+    def __iter__(self):
+        return map(IntToIPv4, self._range)
+
+    def __reversed__(self):
+        return map(IntToIPv4, reversed(self._range))
+
+    def __contains__(self, ip):
+        return self._ToInt(ip) in self._range
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return IPv4Range(self._range[index])
+        return IntToIPv4(self._range[index])
+
+    def index(self, ip):
+        num = self._ToInt(ip)
+        if num not in self._range:
+            raise ValueError('{} is not in {}'.format(ip, self))
+        return self._range.index(num)
+
+    def __eq__(self, other):
+        if isinstance(other, IPv4Range):
+            return self._range == other._range
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._range)
+
+    def __repr__(self):
+        r = self._range
+        if len(r) == 0:
+            return 'IPv4Range(empty)'
+        return 'IPv4Range({}, {}, step={})'.format(IntToIPv4(r[0]), IntToIPv4(r[-1]), r.step)
+
+
+def IterIPs(start, end_or_cidr=None, step=1):
+    '''
+    Generator version of IPv4Range()
+    Example: for ip in IterIPs('192.168.1.0/24'): ...
+    '''
+    return iter(IPv4Range(start, end_or_cidr, step))
+
+
 def IncrementIP(IP):
     '''
     This function will take an IP and increment it by one.
@@ -192,34 +698,24 @@ def IncrementIP(IP):
     :param IP: str like '192.168.254.254'
     :return: str like '192.168.254.255'
     '''
-    IPsplit = IP.split('.')
+    return IntToIPv4((IPv4ToInt(IP) + 1) & 0xFFFFFFFF)
 
-    Oct1 = int(IPsplit[0])
-    Oct2 = int(IPsplit[1])
-    Oct3 = int(IPsplit[2])
-    Oct4 = int(IPsplit[3])
 
-    Oct4 += 1
-    if Oct4 > 255:
-        Oct4 = 0
-        Oct3 += 1
-        if Oct3 > 255:
-            Oct3 = 0
-            Oct2 += 1
-            if Oct2 > 255:
-                Oct2 = 0
-                Oct1 += 1
-                if Oct1 > 255:
-                    Oct1 = 0
-
-    return '{}.{}.{}.{}'.format(Oct1, Oct2, Oct3, Oct4)
+_MAC_RE = re.compile("[0-9a-fA-F]{2}([-:]?)[0-9a-fA-F]{2}(\\1[0-9a-fA-F]{2}){4}$")
+_IPV4_OCTET = '(?:25[0-5]|2[0-4][0-9]|[01]?[0-9]?[0-9])'
+_IPV4_RE = re.compile('(?:{0}\\.){{3}}{0}'.format(_IPV4_OCTET))
+_NON_HEX_BYTES = bytes(b for b in range(256) if chr(b) not in '0123456789ABCDEF')
+_NON_DIGIT_BYTES = bytes(b for b in range(256) if chr(b) not in '0123456789')
+_HEX_DIGIT_BYTES = b'0123456789abcdefABCDEF'
+_MAC_SEPARATOR_BYTES = b'-:. '
+_MAX_MAC = 0xFFFFFFFFFFFF
 
 
 def IsValidMACAddress(mac):
     if not isinstance(mac, str):
         return False
 
-    return bool(re.match("[0-9a-f]{2}([-:]?)[0-9a-f]{2}(\\1[0-9a-f]{2}){4}$", mac.lower()))
+    return bool(_MAC_RE.match(mac))
 
 
 def IsValidHostname(hostname):
@@ -246,22 +742,11 @@ def IsValidIPv4(ip):
     Returns True if ip is a valid IPv4 IP like '192.168.254.254'
     Example '192.168.254.254' > return True
     Example '192.168.254.300' > return False
+    Octets are 1 to 3 digits, so ' 1.2.3.4' and '1.2.3.0001' are not valid
     :param ip: str like '192.168.254.254'
     :return: bool
     '''
-    ip_split = ip.split('.')
-    if len(ip_split) != 4:
-        return False
-
-    for octet in ip_split:
-        try:
-            octet_int = int(octet)
-            if not 0 <= octet_int <= 255:
-                return False
-        except:
-            return False
-
-    return True
+    return isinstance(ip, str) and _IPV4_RE.fullmatch(ip) is not None
 
 
 def GetKeyFromValue(d, v):
@@ -272,55 +757,437 @@ def GetKeyFromValue(d, v):
     :param v: value within d
     :return: first key from d that has the value == v. If v is not found in v, return None
     '''
+    if isinstance(d, BiDict):
+        return d.GetKey(v)
+
     for k in d:
         if d[k] == v:
             return k
 
 
+_MISSING = object()
+
+
+class BiDict(dict):
+    '''
+    A dict that keeps a reverse index (value > keys) so GetKey() is O(1) instead of a linear scan.
+    Like GetKeyFromValue(), if several keys have the same value, GetKey() returns the one that comes first in the dict.
+    Values must be hashable.
+
+    d = BiDict({'Input1': 1, 'Input2': 2})
+    d.GetKey(2) >>> 'Input2'
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._seq = itertools.count()
+        self._order = {}  # {key: int(insertion number)}
+        self._reverse = {}  # {value: [(int(insertion number), key), ...]} sorted by insertion number
+        self.update(*args, **kwargs)
+
+    def _Unindex(self, key, value):
+        entries = self._reverse[value]
+        if len(entries) == 1:
+            del self._reverse[value]
+        else:
+            del entries[bisect.bisect_left(entries, (self._order[key],))]
+
+    def __setitem__(self, key, value):
+        hash(value)  # raises TypeError for an unhashable value before anything is changed
+        if key in self:
+            oldValue = dict.__getitem__(self, key)
+            if oldValue == value:
+                dict.__setitem__(self, key, value)
+                return
+            self._Unindex(key, oldValue)
+        else:
+            self._order[key] = next(self._seq)
+
+        dict.__setitem__(self, key, value)
+        entries = self._reverse.get(value)
+        if entries is None:
+            self._reverse[value] = [(self._order[key], key)]
+        else:
+            bisect.insort(entries, (self._order[key], key))
+
+    def __delitem__(self, key):
+        self._Unindex(key, dict.__getitem__(self, key))
+        dict.__delitem__(self, key)
+        del self._order[key]
+
+    def pop(self, key, default=_MISSING):
+        if key in self:
+            value = dict.__getitem__(self, key)
+            del self[key]
+            return value
+        elif default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        dict.__setitem__(self, key, value)
+        del self[key]
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        dict.clear(self)
+        self._order.clear()
+        self._reverse.clear()
+
+    def __ior__(self, other):
+        # b |= {...} must go through update() or the reverse index misses the new items
+        self.update(other)
+        return self
+
+    def copy(self):
+        return BiDict(self)
+
+    def __copy__(self):
+        # copy.copy() would otherwise share _order/_reverse with this dict
+        return self.copy()
+
+    def __reduce__(self):
+        # pickle and copy.deepcopy() rebuild the index from the items
+        return BiDict, (dict(self),)
+
+    def GetKey(self, value, default=None):
+        '''
+        :param value: value within self
+        :return: first key that has the value == value. If value is not found, return default
+        '''
+        entries = self._reverse.get(value)
+        if entries is None:
+            return default
+        return entries[0][1]
+
+    def GetKeys(self, value):
+        # return all keys that have the value, in dict order
+        return [key for seq, key in self._reverse.get(value, ())]
+
+
 def StripNonHex(string):
-    ret = ''
-    for c in string.upper():
-        if c in '0123456789ABCDEF':
-            ret += c
-    return ret
+    # 'aa:bb:cc' > 'AABBCC'
+    return string.upper().encode('ascii', 'ignore').translate(None, _NON_HEX_BYTES).decode('ascii')
 
 
 def MACFormat(macString):
     # macString can be any string like 'aabbccddeeff'
 
-    macString = StripNonHex(macString)
-    while len(macString) < 12:
-        macString = '0' + macString
+    return _MACFormatHex(StripNonHex(macString))
+
+
+def _BatchResult(values, like, typecode=None):
+    # Returns a NumPy array when the input was a NumPy array, otherwise a list (or array.array if typecode is given)
+    if hasattr(like, 'dtype'):
+        import numpy
+        return numpy.fromiter(values, dtype=bool if typecode is None else numpy.uint64 if typecode == 'Q' else numpy.uint32)
+    elif typecode is None:
+        return list(values)
+    else:
+        return array(typecode, values)
+
+
+def ValidateIPv4Many(ips):
+    '''
+    Batch version of IsValidIPv4()
+    Example ValidateIPv4Many(['192.168.254.254', '192.168.254.300']) > [True, False]
+    :param ips: iterable of str (or a NumPy string array)
+    :return: list of bool (or NumPy bool array if ips is a NumPy array)
+    '''
+    match = _IPV4_RE.fullmatch
+    return _BatchResult((isinstance(ip, str) and match(ip) is not None for ip in ips), ips)
+
+
+def _PackIPv4(ip, invalid):
+    try:
+        return IPv4ToInt(ip)
+    except ValueError:
+        return invalid
+
+
+def PackIPv4Many(ips, invalid=0):
+    '''
+    Converts many IPs to 32-bit ints.
+    Example PackIPv4Many(['192.168.254.254', 'bad']) > array('I', [3232300798, 0])
+    :param ips: iterable of str (or a NumPy string array)
+    :param invalid: int, the value used for any item that is not a valid IPv4
+    :return: array.array('I') (or NumPy uint32 array if ips is a NumPy array)
+    '''
+    return _BatchResult((_PackIPv4(ip, invalid) for ip in ips), ips, 'I')
+
+
+def ValidateMACMany(macs):
+    '''
+    Batch version of IsValidMACAddress()
+    :param macs: iterable of str (or a NumPy string array)
+    :return: list of bool (or NumPy bool array if macs is a NumPy array)
+    '''
+    match = _MAC_RE.match
+    return _BatchResult((isinstance(mac, str) and match(mac) is not None for mac in macs), macs)
+
+
+def StripNonHexMany(strings):
+    # Batch version of StripNonHex(), returns a list of str
+    delete = _NON_HEX_BYTES
+    return [s.upper().encode('ascii', 'ignore').translate(None, delete).decode() for s in strings]
+
+
+_MAC_FORMAT_12 = '{}{}-{}{}-{}{}-{}{}-{}{}-{}{}'.format
+
+
+def _MACFormatHex(macString):
+    # macString is already stripped to hex characters
+    if len(macString) < 12:
+        macString = macString.zfill(12)
+
+    if len(macString) == 12:
+        return _MAC_FORMAT_12(*macString)
 
     return '-'.join([macString[i: i + 2] for i in range(0, len(macString), 2)])
 
 
+def MACFormatMany(macs):
+    '''
+    Batch version of MACFormat()
+    Example MACFormatMany(['aabbccddeeff', 'AA:BB:CC:DD:EE:FF']) > ['AA-BB-CC-DD-EE-FF', 'AA-BB-CC-DD-EE-FF']
+    :param macs: iterable of str (or a NumPy string array)
+    :return: list of str
+    '''
+    return [_MACFormatHex(macString) for macString in StripNonHexMany(macs)]
+
+
+def PackMACMany(macs):
+    '''
+    Converts many MAC strings (in any format accepted by MACFormat()) to 48-bit ints.
+    Items with no hex characters are packed as 0.
+    :param macs: iterable of str (or a NumPy string array)
+    :return: array.array('Q') (or NumPy uint64 array if macs is a NumPy array)
+    '''
+    return _BatchResult((int(h, 16) if h else 0 for h in StripNonHexMany(macs)), macs, 'Q')
+
+
+def MACToInt(mac):
+    '''
+    Converts a MAC in any format to a 48-bit int
+    Example: 'AA-BB-CC-DD-EE-FF', 'aa:bb:cc:dd:ee:ff', 'aabb.ccdd.eeff' and b'\xaa\xbb\xcc\xdd\xee\xff' > 187723572702975
+    Raises ValueError unless mac is exactly 12 hex digits (with optional '-', ':', '.' or ' ' separators),
+        6 bytes or an int from 0 to 0xFFFFFFFFFFFF
+    :param mac: str, bytes/bytearray/memoryview (the raw 6 bytes) or int
+    :return: int
+    '''
+    if isinstance(mac, int):
+        if not 0 <= mac <= _MAX_MAC:
+            raise ValueError('MAC {} is not a 48-bit int'.format(mac))
+        return mac
+    elif isinstance(mac, str):
+        hexBytes = mac.encode('ascii', 'replace').translate(None, _MAC_SEPARATOR_BYTES)
+        if len(hexBytes) != 12 or hexBytes.translate(None, _HEX_DIGIT_BYTES):
+            raise ValueError('{} is not a valid MAC address'.format(repr(mac)))
+        return int(hexBytes, 16)
+    else:
+        if len(mac) != 6:
+            raise ValueError('MAC bytes must be 6 bytes long, not {}'.format(len(mac)))
+        return int.from_bytes(mac, byteorder='big')
+
+
+def IntToMAC(num):
+    # 187723572702975 > 'AA-BB-CC-DD-EE-FF'
+    if not 0 <= num <= _MAX_MAC:
+        raise ValueError('MAC {} is not a 48-bit int'.format(num))
+    return _MAC_FORMAT_12(*'{:012X}'.format(num))
+
+
+class MacTable:
+    '''
+    A dict-like container keyed by MAC address.
+    Keys can be given in any format accepted by MACToInt() and are stored as 48-bit ints,
+        so table['aa:bb:cc:dd:ee:ff'] and table['AA-BB-CC-DD-EE-FF'] are the same entry.
+    Iterating returns the MACs formatted like MACFormat()
+
+    table = MacTable()
+    table['aa:bb:cc:dd:ee:ff'] = 'Lectern Laptop'
+    'AABBCCDDEEFF' in table >>> True
+    '''
+
+    def __init__(self, items=None):
+        self._data = {}  # {int(mac): value}
+        if items is not None:
+            self.Load(items)
+
+    def __setitem__(self, mac, value):
+        self._data[MACToInt(mac)] = value
+
+    def __getitem__(self, mac):
+        return self._data[MACToInt(mac)]
+
+    def __delitem__(self, mac):
+        del self._data[MACToInt(mac)]
+
+    def __contains__(self, mac):
+        try:
+            return MACToInt(mac) in self._data
+        except (ValueError, TypeError):
+            return False
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return map(IntToMAC, self._data)
+
+    def get(self, mac, default=None):
+        return self._data.get(MACToInt(mac), default)
+
+    def pop(self, mac, *default):
+        return self._data.pop(MACToInt(mac), *default)
+
+    def Add(self, mac, value=None):
+        self._data[MACToInt(mac)] = value
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return self._data.values()
+
+    def items(self):
+        return [(IntToMAC(num), value) for num, value in self._data.items()]
+
+    def Ints(self):
+        # returns the keys as a compact array('Q') of ints
+        return array('Q', self._data)
+
+    def Load(self, items):
+        '''
+        Adds many entries
+        :param items: dict, iterable of (mac, value) pairs, or iterable of macs (values will be None)
+        '''
+        if hasattr(items, 'items'):
+            items = items.items()
+
+        data = self._data
+        for item in items:
+            if isinstance(item, (tuple, list)):
+                data[MACToInt(item[0])] = item[1]
+            else:
+                data[MACToInt(item)] = None
+
+    def LoadCSV(self, path, macColumn=0, valueColumn=1, header=True):
+        '''
+        Adds the rows of a CSV file
+        :param path: str
+        :param macColumn: int index or str column name (if header is True)
+        :param valueColumn: int index or str column name, None to use the whole row as the value
+        :param header: bool, True if the first row has column names
+        :return: int number of rows loaded
+        '''
+        with open(path, mode='rt', newline='') as file:
+            reader = _csv.reader(file)
+            if header:
+                names = next(reader, [])
+                if isinstance(macColumn, str):
+                    macColumn = names.index(macColumn)
+                if isinstance(valueColumn, str):
+                    valueColumn = names.index(valueColumn)
+
+            count = 0
+            data = self._data
+            for row in reader:
+                if not row:
+                    continue
+                data[MACToInt(row[macColumn])] = row if valueColumn is None else row[valueColumn]
+                count += 1
+        return count
+
+    def __repr__(self):
+        return 'MacTable({})'.format(dict(self.items()))
+
+
 def GetMac():
-    from uuid import getnode as get_mac
-    mac = hex(get_mac())
+    mac = hex(GetUniqueMachineID())
     return MACFormat(mac)
 
 
-def PhoneFormat(n):
+# {'country': {int(numOfDigits): 'pattern'}}, use AddPhoneFormat() to add more
+PHONE_FORMATS = {
+    'US': {
+        7: '###-####',
+        10: '###-###-####',
+        11: '#-###-###-####',
+    },
+}
+
+_phoneFormatStrings = {}  # {('country', numOfDigits): str.format string}
+
+
+def AddPhoneFormat(country, pattern):
+    '''
+    Example: AddPhoneFormat('UK', '#### ### ####')
+    :param country: str
+    :param pattern: str, each '#' is replaced by a digit
+    '''
+    PHONE_FORMATS.setdefault(country, {})[pattern.count('#')] = pattern
+    _phoneFormatStrings.clear()
+
+
+def _PhoneFormatString(country, numOfDigits):
+    key = (country, numOfDigits)
+    if key not in _phoneFormatStrings:
+        pattern = PHONE_FORMATS.get(country, {}).get(numOfDigits)
+        if pattern is not None:
+            pattern = pattern.replace('{', '{{').replace('}', '}}').replace('#', '{}')
+        _phoneFormatStrings[key] = pattern
+    return _phoneFormatStrings[key]
+
+
+def PhoneFormat(n, country='US'):
     '''
     This function formats a string like a phone number
     Example: '8006339876' > '800-633-9876'
-    :param n:
-    :return:
+    Example: '(800) 633.9876' > '800-633-9876'
+    If there is no pattern in PHONE_FORMATS for the number of digits, the digits are returned unformatted.
+    :param n: str
+    :param country: str, a key of PHONE_FORMATS
+    :return: str
     '''
     try:
         n = StripNonNumbers(n)
-        return format(int(n[:-1]), ",").replace(",", "-") + n[-1]
     except:
         return n
 
+    formatString = _PhoneFormatString(country, len(n))
+    if formatString is None:
+        return n
+    return formatString.format(*n)
+
+
+def PhoneFormatMany(numbers, country='US'):
+    # Batch version of PhoneFormat(), returns a list
+    return [PhoneFormat(n, country) for n in numbers]
+
 
 def StripNonNumbers(s):
-    new_s = ''
-    for ch in s:
-        if ch.isdigit():
-            new_s += ch
-    return new_s
+    # '(800) 633-9876' > '8006339876'
+    try:
+        return s.encode('ascii').translate(None, _NON_DIGIT_BYTES).decode('ascii')
+    except UnicodeEncodeError:
+        # keep other unicode digits, like str.isdigit()
+        return ''.join(filter(str.isdigit, s))
+
+
+def StripNonNumbersMany(strings):
+    # Batch version of StripNonNumbers(), returns a list
+    return [StripNonNumbers(s) for s in strings]
 
 
 # Non-global variables **********************************************************
@@ -337,46 +1204,212 @@ class NonGlobal:
         return getattr(self, name_of_value_str)
 
 
+_machineID = None
+
+
 def GetUniqueMachineID():
-    return uuid.getnode()
+    # uuid.getnode() can be slow, so the result is cached
+    global _machineID
+    if _machineID is None:
+        _machineID = _uuid.getnode()
+    return _machineID
+
+
+HEX_ALPHABET = '0123456789abcdef'
+BASE32_ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ234567'
+BASE64_ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'  # url-safe
+PASSWORD_ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
+
+
+@functools.lru_cache(maxsize=32)
+def _TokenTables(alphabet):
+    # returns (translateTable, bytesToDelete) to map random bytes onto the alphabet without bias
+    n = len(alphabet)
+    limit = 256 - 256 % n  # bytes >= limit are discarded, so every character is equally likely
+    table = bytes(ord(alphabet[b % n]) for b in range(256))
+    delete = bytes(range(limit, 256))
+    return table, delete
+
+
+def _RandomChars(numChars, alphabet):
+    if len(alphabet) == 1:
+        return alphabet * numChars
+
+    if any(ord(ch) > 127 for ch in alphabet):
+        return ''.join(_secrets.choice(alphabet) for _ in range(numChars))
+
+    table, delete = _TokenTables(alphabet)
+    ret = bytearray()
+    while len(ret) < numChars:
+        need = numChars - len(ret)
+        ret += _os.urandom(need + need // 4 + 8).translate(table, delete)
+    return ret[:numChars].decode('ascii')
+
+
+def GetRandomToken(length=32, alphabet=PASSWORD_ALPHABET):
+    '''
+    Returns a cryptographically secure random string
+    Example: GetRandomToken(8) >>> 'p3XcQ0aZ'
+    :param length: int
+    :param alphabet: str, the characters that can be used (each must be unique)
+    :return: str
+    '''
+    if len(set(alphabet)) != len(alphabet) or not alphabet:
+        raise ValueError('alphabet must be a non-empty string of unique characters')
+    return _RandomChars(length, alphabet)
+
+
+def GetRandomTokens(count, length=32, alphabet=PASSWORD_ALPHABET):
+    '''
+    Returns a list of count random tokens, generated from a single read of the OS random source
+    :param count: int
+    :param length: int
+    :param alphabet: str
+    :return: list of str
+    '''
+    chars = GetRandomToken(count * length, alphabet)
+    return [chars[i:i + length] for i in range(0, count * length, length)]
+
+
+def GetRandomHex(length=32):
+    # Example: GetRandomHex(8) >>> '9f86d081'
+    return GetRandomToken(length, HEX_ALPHABET)
+
+
+def GetRandomBase32(length=32):
+    # Example: GetRandomBase32(8) >>> 'K5QXG4ZB'
+    return GetRandomToken(length, BASE32_ALPHABET)
+
+
+def GetRandomBase64(length=32):
+    # url-safe base64 characters, no padding
+    return GetRandomToken(length, BASE64_ALPHABET)
 
 
 def GetRandomHash(length=None):
-    pw = GetRandomPassword()
-    hash = HashIt(pw)
+    # Returns a random hex string, 128 characters by default (the length of a sha512 hexdigest)
     if length is None:
-        length = len(hash)
+        length = 128
+
+    return GetRandomHex(length)
+
 
-    return hash[:length]
+_machineSalt = None
 
 
-def HashIt(string=None, salt=str(uuid.getnode())):
+def _GetMachineSalt():
+    # only looked up the first time a default salt is needed
+    global _machineSalt
+    if _machineSalt is None:
+        _machineSalt = str(GetUniqueMachineID())
+    return _machineSalt
+
+
+def HashIt(string=None, salt=None):
     '''
     This function takes in a string and converts it to a unique hash.
     Note: this is a one-way conversion. The value cannot be converted from hash to the original string
     :param string: string, if None a random hash will be returned
+    :param salt: str, defaults to the machine's MAC address as a str
     :return: str
     '''
+    if salt is None:
+        salt = _GetMachineSalt()
+
     if string is None:
         # if None a random hash will be returned
-        string = str(random.random())
+        string = str(_random.random())
 
     if not isinstance(string, str):
         string = str(string)
 
-    hash1 = hashlib.sha512(bytes(string, 'utf-8')).hexdigest()
+    hash1 = _hashlib.sha512(bytes(string, 'utf-8')).hexdigest()
     hash1 += salt
-    hash2 = hashlib.sha512(bytes(hash1, 'utf-8')).hexdigest()
+    hash2 = _hashlib.sha512(bytes(hash1, 'utf-8')).hexdigest()
     return hash2
 
 
-def GetRandomPassword(length=512):
-    pw = ''
-    for i in range(length):
-        ch = random.choice(['1', '2', '3', '4', '5', '6', '7', '8', '9', '0',
-                            'a', 'b', 'c', 'd', 'f'])
-        pw += ch
-    return pw
+HASH_CHUNK_SIZE = 65536
+HASH_CACHE_MAX_LENGTH = 256  # only inputs this short are kept in the HashData() cache
+
+
+def _IterChunks(data, chunkSize):
+    # yields bytes-like chunks from bytes, str, a file object or an iterable of those
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        yield data
+    elif isinstance(data, str):
+        yield data.encode('utf-8')
+    elif hasattr(data, 'read'):
+        while True:
+            chunk = data.read(chunkSize)
+            if not chunk:
+                break
+            yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+    else:
+        for item in data:
+            for chunk in _IterChunks(item, chunkSize):
+                yield chunk
+
+
+def _HashChunks(chunks, algorithm, iterations, salt):
+    h = _hashlib.new(algorithm)
+    if salt:
+        h.update(salt)
+    for chunk in chunks:
+        h.update(chunk)
+
+    digest = h.digest()
+    for _ in range(iterations - 1):
+        h = _hashlib.new(algorithm)
+        if salt:
+            h.update(salt)
+        h.update(digest)
+        digest = h.digest()
+
+    return _binascii.hexlify(digest).decode()
+
+
+@functools.lru_cache(maxsize=1024)
+def _HashShortCached(data, algorithm, iterations, salt):
+    return _HashChunks((data,), algorithm, iterations, salt)
+
+
+def HashData(data, algorithm='sha256', iterations=1, salt=b'', cache=False, chunkSize=HASH_CHUNK_SIZE):
+    '''
+    Hashes data without reading it all into memory.
+    HashData(b'hello')
+    HashData(open('firmware.bin', 'rb'), 'sha512')
+    HashData(['user', 'name'])  # same as HashData('username')
+
+    :param data: bytes, str (encoded as utf-8), a file object, or an iterable of those
+    :param algorithm: str, any name accepted by hashlib.new()
+    :param iterations: int, the digest is re-hashed (with the salt) this many times in total
+    :param salt: bytes or str, prepended to the data on every iteration. None uses the machine's MAC address
+    :param cache: bool, if True short str/bytes inputs are kept in a bounded LRU cache
+    :param chunkSize: int, bytes read at a time from file objects
+    :return: str hexdigest
+    '''
+    if salt is None:
+        salt = _GetMachineSalt()
+    if isinstance(salt, str):
+        salt = salt.encode('utf-8')
+
+    if cache and isinstance(data, (str, bytes)) and len(data) <= HASH_CACHE_MAX_LENGTH:
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return _HashShortCached(data, algorithm, iterations, salt)
+
+    return _HashChunks(_IterChunks(data, chunkSize), algorithm, iterations, salt)
+
+
+def HashFile(path, algorithm='sha256', iterations=1, salt=b'', chunkSize=HASH_CHUNK_SIZE):
+    # Hashes the file at path, chunkSize bytes at a time
+    with open(path, mode='rb') as file:
+        return HashData(file, algorithm, iterations, salt, chunkSize=chunkSize)
+
+
+def GetRandomPassword(length=512, alphabet=HEX_ALPHABET):
+    return GetRandomToken(length, alphabet)
 
 
 def GetDatetimeKwargs(dt, utcOffsetHours=None):
@@ -401,7 +1434,7 @@ def GetDatetimeKwargs(dt, utcOffsetHours=None):
 
 
 def GetDatetimeFromKwargs(**kwargs):
-    return datetime.datetime(
+    return _datetime.datetime(
         year=kwargs.get('year'),
         month=kwargs.get('month'),
         day=kwargs.get('day'),
@@ -413,13 +1446,18 @@ def GetDatetimeFromKwargs(**kwargs):
 
 
 def StringToBytes(text):
-    # 'hello world' > [104, 101, 108, 108, 111, 32, 119, 111, 114, 108, 100]
-    return bytes(list(ord(c) for c in text))
+    # 'hello world' > b'hello world' (each character must be < 256)
+    return text.encode('latin-1')
 
 
 def BytesToString(binary):
     # b'hello world' > hello world
-    return "".join(chr(b) for b in binary)
+    # also accepts bytearray/memoryview without copying them
+    try:
+        return _codecs.latin_1_decode(binary)[0]
+    except TypeError:
+        # an iterable of ints like [104, 101, 108, 108, 111]
+        return bytes(binary).decode('latin-1')
 
 
 def BytesToInt(b):
@@ -427,223 +1465,1028 @@ def BytesToInt(b):
     return int.from_bytes(b, byteorder='big')
 
 
-def HexIntToChr(hexInt):
-    # 22 > '\"'
-    return bytes.fromhex(str(hexInt)).decode()
+def HexIntToChr(hexInt):
+    # 22 > '\"'
+    return bytes.fromhex(str(hexInt)).decode()
+
+
+def MacStringToMacBytes(macString):
+    '''
+
+    :param macString: str like '11-22-33-44-55-66' return from MACFormat()
+    :return: bytes like b'\x11\x22\x33\x44\x55\x66'
+    '''
+    hexString = StripNonHex(macString)
+    if len(hexString) > 12:
+        raise ValueError('{} has more than 12 hex digits'.format(repr(macString)))
+    return bytes.fromhex(hexString.zfill(12))  # same digits as MACFormat()
+
+
+def MacBytesToMacString(macBytes):
+    # b'\x11\x22\x33\x44\x55\x66' > '11-22-33-44-55-66', also accepts bytearray/memoryview
+    return _MACFormatHex(_binascii.hexlify(macBytes).decode().upper())
+
+
+def PackMACs(macs, buffer=None):
+    '''
+    Packs many MACs into one contiguous buffer, 6 bytes each
+    Raises ValueError if a MAC has more than 12 hex digits, since it would shift every MAC after it
+    :param macs: iterable of str in any format accepted by MACFormat()
+    :param buffer: bytearray to append to, a new one is created if None
+    :return: bytearray
+    '''
+    macs = list(macs)
+    hexStrings = StripNonHexMany(macs)
+    for mac, hexString in zip(macs, hexStrings):
+        if len(hexString) > 12:
+            raise ValueError('{} has more than 12 hex digits'.format(repr(mac)))
+
+    if buffer is None:
+        buffer = bytearray()
+    buffer += bytes.fromhex(''.join(hexString.zfill(12) for hexString in hexStrings))
+    return buffer
+
+
+def UnpackMACs(buffer):
+    '''
+    The opposite of PackMACs()
+    :param buffer: bytes/bytearray/memoryview, length must be a multiple of 6
+    :return: list of str like ['11-22-33-44-55-66', ...]
+    '''
+    if len(buffer) % 6:
+        raise ValueError('buffer length must be a multiple of 6')
+    hexString = _binascii.hexlify(buffer).decode().upper()
+    return [_MAC_FORMAT_12(*hexString[i:i + 12]) for i in range(0, len(hexString), 12)]
+
+
+_hexToByte = None
+_NON_ASCII_RUN = re.compile('([^\x00-\x7f]+)')
+
+
+def _UnquoteBytes(b):
+    global _hexToByte
+    if _hexToByte is None:
+        hexDigits = '0123456789abcdefABCDEF'
+        _hexToByte = {(a + b).encode(): bytes((int(a + b, 16),)) for a in hexDigits for b in hexDigits}
+
+    parts = b.split(b'%')
+    if len(parts) == 1:
+        return b
+
+    ret = [parts[0]]
+    for part in parts[1:]:
+        byte = _hexToByte.get(part[:2])
+        if byte is None:
+            ret.append(b'%')
+            ret.append(part)
+        else:
+            ret.append(byte)
+            ret.append(part[2:])
+    return b''.join(ret)
+
+
+def Unquote(s, encoding='utf-8', errors='replace', plus=False):
+    '''
+    Replaces urlencoded values like '%20' with ' '
+    Multi-byte escapes are decoded with encoding, so 'caf%C3%A9' > 'café'
+    A '%' that is not followed by two hex digits is left as is.
+
+    Example: Unquote('http%3A%2F%2Fwww.codebygrant.com') > 'http://www.codebygrant.com'
+    :param s: str or bytes (if bytes, the result is bytes and encoding/errors are not used)
+    :param encoding: str
+    :param errors: str, see bytes.decode()
+    :param plus: bool, if True '+' is also replaced with ' ' (for query strings)
+    :return: str or bytes
+    '''
+    if isinstance(s, (bytes, bytearray)):
+        if plus:
+            s = s.replace(b'+', b' ')
+        return _UnquoteBytes(bytes(s))
+
+    if plus:
+        s = s.replace('+', ' ')
+    if '%' not in s:
+        return s
+
+    try:
+        return _UnquoteBytes(s.encode('ascii')).decode(encoding, errors)
+    except UnicodeEncodeError:
+        pass
+
+    # like urllib, only the ASCII runs are unquoted and decoded, other literal text is kept as is
+    parts = _NON_ASCII_RUN.split(s)
+    for index in range(0, len(parts), 2):
+        if '%' in parts[index]:
+            parts[index] = _UnquoteBytes(parts[index].encode('ascii')).decode(encoding, errors)
+    return ''.join(parts)
+
+
+def UnquoteMany(strings, encoding='utf-8', errors='replace', plus=False):
+    # Batch version of Unquote(), returns a list
+    return [Unquote(s, encoding, errors, plus) for s in strings]
+
+
+# Processor port map ************************************************************
+
+class ProcessorModel:
+    '''
+    The ports available on one processor model.
+    Capabilities can be read as attributes (model.Relays) or with the original dict keys (model['Relays'], model['IR/S Ports'])
+    Setting a capability either way clears the Find()/Range() indexes of the ProcessorRegistry that holds the model.
+    '''
+    # {'dict key': 'attribute name'}
+    KEYS = {
+        'Serial Ports': 'SerialPorts',
+        'IR/S Ports': 'IRSPorts',
+        'Digital I/Os': 'DigitalIOs',
+        'FLEX I/Os': 'FlexIOs',
+        'Relays': 'Relays',
+        'Power Ports': 'PowerPorts',
+        'eBus': 'eBus',
+        'Contact': 'Contact',
+    }
+    DEFAULTS = {
+        'SerialPorts': 0,
+        'IRSPorts': 0,
+        'DigitalIOs': 0,
+        'FlexIOs': 0,
+        'Relays': 0,
+        'PowerPorts': 0,
+        'eBus': False,
+        'Contact': 0,
+    }
+    __slots__ = ('PartNumber', 'Name') + tuple(DEFAULTS) + ('_registry',)
+
+    def __init__(self, partNumber, name=None, **capabilities):
+        self._registry = None  # the ProcessorRegistry whose indexes include this model
+        self.PartNumber = partNumber
+        self.Name = name
+        for attr, default in self.DEFAULTS.items():
+            setattr(self, attr, default)
+        self.Update(capabilities)
+
+    @classmethod
+    def _Attr(cls, key):
+        attr = cls.KEYS.get(key, key)
+        if attr not in cls.DEFAULTS:
+            raise KeyError('Unknown processor capability "{}"'.format(key))
+        return attr
+
+    def Update(self, capabilities):
+        # capabilities is a dict with dict keys or attribute names like {'Serial Ports': 8, 'Relays': 4}
+        for key, value in capabilities.items():
+            if key == 'Name':
+                self.Name = value
+            else:
+                setattr(self, self._Attr(key), value)
+
+    def __setattr__(self, attr, value):
+        object.__setattr__(self, attr, value)
+        if attr in self.DEFAULTS and self._registry is not None:
+            self._registry._indexes.pop(attr, None)
+
+    def __getitem__(self, key):
+        return getattr(self, self._Attr(key))
+
+    def __setitem__(self, key, value):
+        # model['Relays'] = 6 works like the old dict
+        setattr(self, self._Attr(key), value)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self.KEYS.keys()
+
+    def items(self):
+        return [(key, getattr(self, attr)) for key, attr in self.KEYS.items()]
+
+    def ToDict(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, ProcessorModel):
+            return all(getattr(self, attr) == getattr(other, attr) for attr in ('PartNumber', 'Name') + tuple(self.DEFAULTS))
+        elif isinstance(other, dict):
+            return self.ToDict() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return 'ProcessorModel({}, {}, {})'.format(self.PartNumber, self.Name, self.ToDict())
+
+
+class ProcessorRegistry:
+    '''
+    Holds a ProcessorModel for each part number.
+    Works like the old dict of dicts (registry['60-1418-01']['Relays']) and adds indexed queries:
+
+    registry.Find(Relays=(4, None), eBus=True) >>> models with 4 or more relays and eBus
+    registry.Find(SerialPorts=3) >>> models with exactly 3 serial ports
+    '''
+
+    def __init__(self):
+        self._models = {}  # {'partNumber': ProcessorModel}
+        self._indexes = {}  # {'attr': ([sorted values], [partNumbers in the same order])}, rebuilt after changes
+
+    def Add(self, partNumber, name=None, **capabilities):
+        '''
+        Adds a new model, or updates the capabilities of an existing one
+        :param partNumber: str like '60-1418-01'
+        :param name: str like 'IPCP Pro 550'
+        :param capabilities: like SerialPorts=8, Relays=4
+        :return: ProcessorModel
+        '''
+        model = self._models.get(partNumber)
+        if model is None:
+            model = self._models[partNumber] = ProcessorModel(partNumber, name, **capabilities)
+            model._registry = self
+        else:
+            if name is not None:
+                model.Name = name
+            model.Update(capabilities)
+        self._indexes.clear()
+        return model
+
+    def LoadJSON(self, path):
+        '''
+        Merges extra models from a JSON file like {"60-1418-01": {"Name": "IPCP Pro 550", "Serial Ports": 8, ...}, ...}
+        Capabilities that are not in the file keep their current (or default) value.
+        :param path: str
+        '''
+        with open(path, mode='rt') as file:
+            data = _json.load(file)
+
+        for partNumber, capabilities in data.items():
+            model = self._models.get(partNumber)
+            if model is None:
+                model = self._models[partNumber] = ProcessorModel(partNumber, **capabilities)
+                model._registry = self
+            else:
+                model.Update(capabilities)
+        self._indexes.clear()
+
+    def _Index(self, attr):
+        index = self._indexes.get(attr)
+        if index is None:
+            pairs = sorted((getattr(model, attr), partNumber) for partNumber, model in self._models.items())
+            index = self._indexes[attr] = ([value for value, _ in pairs], [partNumber for _, partNumber in pairs])
+        return index
+
+    def Range(self, capability, minimum=None, maximum=None):
+        '''
+        :param capability: str attribute name like 'Relays' or dict key like 'Serial Ports'
+        :param minimum: inclusive, None for no lower limit
+        :param maximum: inclusive, None for no upper limit
+        :return: list of part numbers
+        '''
+        values, partNumbers = self._Index(ProcessorModel._Attr(capability))
+        start = 0 if minimum is None else bisect.bisect_left(values, minimum)
+        end = len(values) if maximum is None else bisect.bisect_right(values, maximum)
+        return partNumbers[start:end]
+
+    def Find(self, **criteria):
+        '''
+        :param criteria: like Relays=(4, None) for a range (min, max), or eBus=True for an exact value
+        :return: list of ProcessorModel sorted by part number
+        '''
+        found = None
+        for capability, value in criteria.items():
+            minimum, maximum = value if isinstance(value, tuple) else (value, value)
+            matches = set(self.Range(capability, minimum, maximum))
+            found = matches if found is None else found & matches
+            if not found:
+                break
+
+        if found is None:
+            found = self._models
+        return [self._models[partNumber] for partNumber in sorted(found)]
+
+    def __getitem__(self, partNumber):
+        return self._models[partNumber]
+
+    def __setitem__(self, partNumber, capabilities):
+        # registry['60-1418-01'] = {'Serial Ports': 8, ...} works like the old dict
+        oldModel = self._models.pop(partNumber, None)
+        if oldModel is not None:
+            oldModel._registry = None
+        self.Add(partNumber, **capabilities)
+
+    def get(self, partNumber, default=None):
+        return self._models.get(partNumber, default)
+
+    def __contains__(self, partNumber):
+        return partNumber in self._models
+
+    def __iter__(self):
+        return iter(self._models)
+
+    def __len__(self):
+        return len(self._models)
+
+    def keys(self):
+        return self._models.keys()
+
+    def values(self):
+        return self._models.values()
+
+    def items(self):
+        return self._models.items()
+
+
+def _BuildProcessorCapabilities():
+    registry = ProcessorRegistry()
+    registry.Add('60-1418-01', 'IPCP Pro 550', SerialPorts=8, IRSPorts=8, FlexIOs=4, Relays=8, PowerPorts=4, eBus=True)
+    registry.Add('60-1412-01', 'IPL Pro S1', SerialPorts=1)
+    registry.Add('60-1413-01', 'IPL Pro S3', SerialPorts=3)
+    registry.Add('60-1414-01', 'IPL Pro CR88', SerialPorts=6)
+    registry.Add('60-1429-01', 'IPCP Pro 250', SerialPorts=2, IRSPorts=1, DigitalIOs=4, Relays=2, eBus=True)
+    registry.Add('60-1417-01', 'IPCP Pro 350', SerialPorts=3, IRSPorts=2, DigitalIOs=4, Relays=4, eBus=True)
+    return registry
+
+
+_LAZY_ATTRIBUTES['PROCESSOR_CAPABILITIES'] = _BuildProcessorCapabilities
+
+
+def ConvertDictToTupTup(d, frozen=False):
+    # frozen=True returns a FrozenHashableDict, which caches its hash
+    print('448 ConvertDictToTupTup', d)
+    if d is None:
+        return None
+    elif frozen:
+        return FrozenHashableDict(d)
+    else:
+        return HashableDict(d)
+
+
+def GetWeekOfMonth(dt):
+    weeks = _calendar.monthcalendar(dt.year, dt.month)
+    for index, week in enumerate(weeks):
+        if dt.day in week:
+            return index + 1
+
+
+global lastTime
+lastTime = time.time()
+
+
+def PrintTimeDiff(tag=None):
+    global lastTime
+    nowTime = time.time()
+    diff = nowTime - lastTime
+    if tag is not None:
+        print('tag={}, TimeDiff={}'.format(tag, round(diff, 2)))
+    else:
+        print('TimeDiff={}'.format(round(diff, 2)))
+    lastTime = nowTime
+
+
+timeItLog = {
+    # 'Func name': float(avgTime)
+}
+
+timeItStats = {
+    # 'Func name': TimeItStats()
+}
+
+_perf_counter_ns = getattr(time, 'perf_counter_ns', None) or (lambda: int(time.perf_counter() * 1000000000))
+
+# Upper bound (in nanoseconds) of each histogram bucket, 1us to 100s
+TIME_IT_BUCKETS_NS = tuple(
+    mult * 10 ** exp
+    for exp in range(2, 11)
+    for mult in (10, 15, 20, 30, 50, 70)
+    if mult * 10 ** exp <= 100000000000
+)
+
+
+class TimeItStats:
+    '''
+    Execution time statistics for one function.
+    All times are in nanoseconds.
+    The last item of Buckets counts the calls slower than TIME_IT_BUCKETS_NS[-1]
+    '''
+    __slots__ = ('Name', 'Count', 'Sum', 'Min', 'Max', 'Buckets')
+
+    def __init__(self, name):
+        self.Name = name
+        self.Count = 0
+        self.Sum = 0
+        self.Min = None
+        self.Max = None
+        self.Buckets = [0] * (len(TIME_IT_BUCKETS_NS) + 1)
+
+    def Add(self, ns):
+        self.Count += 1
+        self.Sum += ns
+        if self.Min is None or ns < self.Min:
+            self.Min = ns
+        if self.Max is None or ns > self.Max:
+            self.Max = ns
+        self.Buckets[bisect.bisect_left(TIME_IT_BUCKETS_NS, ns)] += 1
+
+    @property
+    def Mean(self):
+        return self.Sum / self.Count if self.Count else 0
+
+    def Percentile(self, percent):
+        '''
+        Returns the upper bound of the histogram bucket that holds the given percentile, clamped to Min/Max
+        :param percent: float from 0 to 100
+        :return: int nanoseconds, or None if there are no samples
+        '''
+        if not self.Count:
+            return None
+
+        rank = max(1, percent / 100 * self.Count)
+        total = 0
+        for index, count in enumerate(self.Buckets):
+            total += count
+            if total >= rank:
+                if index < len(TIME_IT_BUCKETS_NS):
+                    return max(self.Min, min(TIME_IT_BUCKETS_NS[index], self.Max))
+                break
+        return self.Max
+
+    def Percentiles(self, percents=(50, 95, 99)):
+        # returns dict like {'p50': int(ns), 'p95': int(ns), 'p99': int(ns)}
+        return {'p{}'.format(p): self.Percentile(p) for p in percents}
+
+    def ToDict(self):
+        d = {
+            'name': self.Name,
+            'count': self.Count,
+            'sum_ns': self.Sum,
+            'min_ns': self.Min,
+            'max_ns': self.Max,
+            'mean_ns': self.Mean,
+        }
+        d.update(('{}_ns'.format(k), v) for k, v in self.Percentiles().items())
+        return d
+
+
+class TimeIt:
+    '''
+    Records the execution time of the decorated function in timeItStats
+
+    @TimeIt()
+    def MyFunc():
+        pass
+
+    sampleRate=0.1 will only time every 10th call
+    enabled=False (or TimeIt.Enabled = False before the decorators run) returns the function unchanged, so there is no overhead
+    '''
+    Enabled = True
+
+    def __init__(self, sampleRate=1, enabled=True):
+        self.sampleRate = sampleRate
+        self.enabled = enabled
+
+    def __call__(self, func):
+        if not (self.enabled and TimeIt.Enabled):
+            return func
+
+        name = '{}.{}'.format(func.__module__, getattr(func, '__qualname__', func.__name__))
+        stats = timeItStats.get(name)
+        if stats is None:
+            stats = timeItStats[name] = TimeItStats(name)
+
+        sampleEvery = max(1, round(1 / self.sampleRate)) if self.sampleRate > 0 else 0
+        if sampleEvery == 0:
+            return func
+
+        counter = itertools.count()
+
+        @functools.wraps(func)
+        def NewFunc(*args, **kwargs):
+            if sampleEvery > 1 and next(counter) % sampleEvery:
+                return func(*args, **kwargs)
+
+            startTime = _perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.Add(_perf_counter_ns() - startTime)
+                timeItLog[name] = stats.Sum / stats.Count / 1000000000
+
+        return NewFunc
+
+
+def GetTimeItStats():
+    '''
+    :return: list of dicts (see TimeItStats.ToDict) sorted from slowest to fastest average
+    '''
+    return [stats.ToDict() for stats in sorted(timeItStats.values(), key=lambda st: st.Mean, reverse=True)]
+
+
+def ResetTimeIt():
+    for stats in timeItStats.values():
+        stats.__init__(stats.Name)
+    timeItLog.clear()
+
+
+def WriteTimeItFile():
+    with _File('TimeIt.log', mode='wt') as file:
+        items = sorted(timeItLog.items(), key=lambda item: item[1], reverse=True)  # from slowest to fastest
+        longestName = max((len(name) for name in timeItLog), default=0)
+
+        for name, t in items:
+            name = name.rjust(longestName, ' ')
+            file.write('FunctionName="{}", ExecutionTime= {} seconds\n'.format(name, t))
+
+
+TIME_IT_CSV_FIELDS = (
+    'timestamp', 'name', 'count', 'sum_ns', 'min_ns', 'max_ns', 'mean_ns', 'p50_ns', 'p95_ns', 'p99_ns',
+)
+
+
+def WriteTimeItReport(path, fmt='jsonl', append=False, opener=open):
+    '''
+    Writes a snapshot of timeItStats to a file.
+    Every record has the same timestamp so appended snapshots can be diffed over time.
+
+    fmt can be:
+        'jsonl' - one JSON object per function per line, including the histogram buckets
+        'csv' - one row per function, the header is only written if the file is empty
+        'folded' - flamegraph folded-stack lines like 'module;Class;Method 1234' where the value is the total microseconds
+
+    :param path: str
+    :param fmt: str 'jsonl', 'csv' or 'folded'
+    :param append: bool, if True the snapshot is added to the end of the file
+    :param opener: callable like open(path, mode) (pass extronlib.system.File on a processor)
+    :return: int, number of records written
+    '''
+    if fmt not in ('jsonl', 'csv', 'folded'):
+        raise ValueError('Unknown report format "{}"'.format(fmt))
+
+    timestamp = time.time()
+    allStats = sorted(timeItStats.values(), key=lambda st: st.Mean, reverse=True)
+
+    with opener(path, mode='at' if append else 'wt') as file:
+        if fmt == 'jsonl':
+            for stats in allStats:
+                d = stats.ToDict()
+                d['timestamp'] = timestamp
+                d['buckets'] = stats.Buckets
+                file.write(_json.dumps(d) + '\n')
+
+        elif fmt == 'csv':
+            writer = _csv.DictWriter(file, TIME_IT_CSV_FIELDS, extrasaction='ignore', lineterminator='\n')
+            if not append or file.tell() == 0:
+                writer.writeheader()
+            for stats in allStats:
+                d = stats.ToDict()
+                d['timestamp'] = timestamp
+                writer.writerow(d)
+
+        elif fmt == 'folded':
+            for stats in allStats:
+                file.write('{} {}\n'.format(stats.Name.replace('.', ';'), stats.Sum // 1000))
+
+    return len(allStats)
+
+
+class ScheduledTask:
+    '''
+    A handle for a function that is called repeatedly by a Scheduler.
+
+    mode='rate' calls func on a fixed grid (start + n * interval), so a slow func does not make the loop drift.
+        If func runs past one or more grid points, those calls are skipped and counted in Skipped.
+    mode='delay' waits interval seconds after func returns before calling it again.
+    '''
+
+    def __init__(self, scheduler, interval, func, mode='rate', jitter=0):
+        if mode not in ('rate', 'delay'):
+            raise ValueError('mode must be "rate" or "delay"')
+        if not interval > 0:
+            raise ValueError('interval must be greater than 0, not {}'.format(interval))
+        if jitter < 0:
+            raise ValueError('jitter must not be negative, not {}'.format(jitter))
+
+        self.Interval = interval
+        self.Func = func
+        self.Mode = mode
+        self.Jitter = jitter
+
+        self.Runs = 0
+        self.Overruns = 0  # number of times func took longer than Interval
+        self.Skipped = 0  # number of grid points missed in 'rate' mode
+        self.LastDuration = None
+        self.Cancelled = False
+
+        self._scheduler = scheduler
+        self._base = None  # the un-jittered time of the next call
+
+    def Cancel(self):
+        self.Cancelled = True
+        self._scheduler._Wake()
+
+    def _NextTime(self, started, finished):
+        duration = finished - started
+        self.LastDuration = duration
+        if duration > self.Interval:
+            self.Overruns += 1
+
+        if self.Mode == 'rate':
+            self._base += self.Interval
+            if self._base < finished:
+                missed = math.ceil((finished - self._base) / self.Interval)
+                self.Skipped += missed
+                self._base += missed * self.Interval
+        else:
+            self._base = finished + self.Interval
+
+        return self._base + (_random.uniform(0, self.Jitter) if self.Jitter else 0)
+
+    def __repr__(self):
+        return 'ScheduledTask({}, interval={}, mode={}, runs={}, overruns={}{})'.format(
+            getattr(self.Func, '__name__', self.Func),
+            self.Interval,
+            self.Mode,
+            self.Runs,
+            self.Overruns,
+            ', cancelled' if self.Cancelled else '',
+        )
 
 
-def MacStringToMacBytes(macString):
+class Scheduler:
     '''
+    Calls any number of periodic functions from a single thread, using a heap ordered by the next call time.
+    The thread is started with extronlib's Wait(0) if it is available, otherwise with threading.Thread.
+    Functions run one at a time, so a slow function delays the others (see ScheduledTask.Overruns).
 
-    :param macString: str like '11-22-33-44-55-66' return from MACFormat()
-    :return: bytes like b'\x11\x22\x33\x44\x55\x66'
+    scheduler = Scheduler()
+    task = scheduler.Every(1, PollDevice)
+    task.Cancel()
     '''
-    macString = MACFormat(macString)  # just to be sure
-    m = [octet for octet in macString.split('-')]
-    ret = [bytes.fromhex(item) for item in m]
-    ret = b''.join(ret)
-    return ret
 
-
-def MacBytesToMacString(macBytes):
-    macBytesHex = binascii.hexlify(macBytes)
-    macString = macBytesHex.decode()
-    return MACFormat(macString)
-
-
-def Unquote(s):
-    # Replaces urlencoded values like '%20' with ' '
-    ret = ''
-    skip = 0
-    for index, ch in enumerate(s):
-        if skip > 0:
-            skip -= 1
-            continue
-
-        if ch == '%' and \
-                index < len(s) + 2 and \
-                s[index + 1] != '%' and \
-                s[index - 1] != '%':
-            h = s[index + 1:index + 3]
-            print('h=', h)
-            try:
-                newCH = chr(int(h, 16))
-                ret += newCH
-                skip = 2
-            except:
-                ret += ch
+    def __init__(self, sink=None):
+        '''
+        :param sink: callable(text, severity) for task errors, defaults to ProgramLog, or FileLogSink() if extronlib is not available
+        '''
+        self.Sink = sink
+        self._heap = []  # [(time, seq, ScheduledTask), ...]
+        self._seq = itertools.count()
+        self._condition = threading.Condition()
+        self._started = False
+        self._stopped = False
+
+    def Every(self, interval, func, mode='rate', jitter=0, delay=None):
+        '''
+        :param interval: float seconds, must be greater than 0
+        :param func: callable with no args
+        :param mode: str 'rate' (fixed-rate) or 'delay' (fixed-delay), see ScheduledTask
+        :param jitter: float, up to this many seconds are randomly added to each call time
+        :param delay: float seconds before the first call, defaults to interval
+        :return: ScheduledTask
+        '''
+        task = ScheduledTask(self, interval, func, mode, jitter)
+        task._base = time.monotonic() + (interval if delay is None else delay)
+        with self._condition:
+            heapq.heappush(self._heap, (task._base, next(self._seq), task))
+            self._condition.notify()
+        self._Start()
+        return task
+
+    def Stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def _Wake(self):
+        with self._condition:
+            self._condition.notify()
+
+    def _Start(self):
+        with self._condition:
+            if self._started:
+                return
+            self._started = True
+
+        if isinstance(_Wait, _LazyExtronName) and not _Wait.Available:
+            threading.Thread(target=self._Run, daemon=True).start()
         else:
-            ret += ch
-    return ret.replace('%%', '%')
+            _Wait(0)(self._Run)
+
+    def _NextTask(self):
+        # blocks until a task is due, returns None if stopped
+        with self._condition:
+            while not self._stopped:
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+
+                when, _, task = self._heap[0]
+                if task.Cancelled:
+                    heapq.heappop(self._heap)
+                    continue
+
+                remaining = when - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+
+                heapq.heappop(self._heap)
+                return task
+
+    def _Run(self):
+        while True:
+            task = self._NextTask()
+            if task is None:
+                return
 
+            started = time.monotonic()
+            try:
+                task.Func()
+            except Exception as e:
+                self._LogError(task, e)
+            task.Runs += 1
 
-# Processor port map ************************************************************
+            try:
+                nextTime = task._NextTime(started, time.monotonic())
+            except Exception as e:
+                # one broken task must never stop the thread that runs all the others
+                self._LogError(task, e)
+                task.Cancelled = True
+
+            if not task.Cancelled:
+                with self._condition:
+                    heapq.heappush(self._heap, (nextTime, next(self._seq), task))
+
+    def _LogError(self, task, e):
+        text = 'Scheduler {} Error: {}\n'.format(task, e)
+        try:
+            if self.Sink is None:
+                self.Sink = _DefaultLogSink()
+            self.Sink(text, 'error')
+        except Exception as sinkError:
+            # the sink itself failed (like FileLogSink in a read-only directory)
+            oldPrint(text, 'Sink Error: {}'.format(sinkError))
 
-PROCESSOR_CAPABILITIES = {
-    # 'Part Number': {'Serial Ports': 8, 'IR/S Ports': 8, 'Digital Inputs...
-}
-PROCESSOR_CAPABILITIES['60-1418-01'] = {  # IPCP Pro 550
-    'Serial Ports': 8,
-    'IR/S Ports': 8,
-    'Digital I/Os': 0,
-    'FLEX I/Os': 4,
-    'Relays': 8,
-    'Power Ports': 4,
-    'eBus': True,
-}
 
-PROCESSOR_CAPABILITIES['60-1412-01'] = {  # IPL Pro S1
-    'Serial Ports': 1,
-    'IR/S Ports': 0,
-    'Digital I/Os': 0,
-    'FLEX I/Os': 0,
-    'Relays': 0,
-    'Power Ports': 0,
-    'eBus': False,
-    'Contact': 0,
-}
-PROCESSOR_CAPABILITIES['60-1413-01'] = {  # IPL Pro S3
-    'Serial Ports': 3,
-    'IR/S Ports': 0,
-    'Digital I/Os': 0,
-    'FLEX I/Os': 0,
-    'Relays': 0,
-    'Power Ports': 0,
-    'eBus': False,
-}
-PROCESSOR_CAPABILITIES['60-1413-01'] = {  # IPL Pro S3
-    'Serial Ports': 3,
-    'IR/S Ports': 0,
-    'Digital I/Os': 0,
-    'FLEX I/Os': 0,
-    'Relays': 0,
-    'Power Ports': 0,
-    'eBus': False,
-}
-PROCESSOR_CAPABILITIES['60-1414-01'] = {  # IPL Pro CR88
-    'Serial Ports': 6,
-    'IR/S Ports': 0,
-    'Digital I/Os': 0,
-    'FLEX I/Os': 0,
-    'Relays': 0,
-    'Power Ports': 0,
-    'eBus': False,
-    'Contact': 0,
-}
+_scheduler = None
 
-PROCESSOR_CAPABILITIES['60-1429-01'] = {  # IPCP Pro 250
-    'Serial Ports': 2,
-    'IR/S Ports': 1,
-    'Digital I/Os': 4,
-    'FLEX I/Os': 0,
-    'Relays': 2,
-    'Power Ports': 0,
-    'eBus': True,
-    'Contact': 0,
-}
 
-PROCESSOR_CAPABILITIES['60-1417-01'] = {  # IPCP Pro 350
-    'Serial Ports': 3,
-    'IR/S Ports': 2,
-    'Digital I/Os': 4,
-    'FLEX I/Os': 0,
-    'Relays': 4,
-    'Power Ports': 0,
-    'eBus': True,
-    'Contact': 0,
-}
+def GetScheduler():
+    # Returns the Scheduler shared by Loop()
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler()
+    return _scheduler
 
 
-def ConvertDictToTupTup(d):
-    print('448 ConvertDictToTupTup', d)
-    if d is None:
-        return None
-    else:
-        return HashableDict(d)
+def Loop(t, func, mode='rate', jitter=0):
+    '''
+    Call the func every t seconds, until the returned task is cancelled.
+    All loops share one thread, see Scheduler.
 
+    task = Loop(5, PollDevice)
+    task.Cancel()
+    :return: ScheduledTask
+    '''
+    return GetScheduler().Every(t, func, mode, jitter)
 
-def GetWeekOfMonth(dt):
-    weeks = calendar.monthcalendar(dt.year, dt.month)
-    for index, week in enumerate(weeks):
-        if dt.day in week:
-            return index + 1
 
+# asyncio ***********************************************************************
+# Counterparts of Loop(), RemoteTrace() and PrintProgramLog() for programs that run on an asyncio event loop.
+# None of these need extronlib.
 
-global lastTime
-lastTime = time.time()
+async def _ALoop(interval, func, mode, sink):
+    loop = _asyncio.get_event_loop()
+    nextTime = loop.time() + interval
+    while True:
+        await _asyncio.sleep(max(0, nextTime - loop.time()))
 
+        try:
+            ret = func()
+            if hasattr(ret, '__await__') or _asyncio.iscoroutine(ret):
+                await ret
+        except _asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # log and keep looping, like Loop()
+            text = 'aloop {} Error: {}\n'.format(func, e)
+            try:
+                sink = sink or _DefaultLogSink()
+                sink(text, 'error')
+            except Exception as sinkError:
+                oldPrint(text, 'Sink Error: {}'.format(sinkError))
+
+        now = loop.time()
+        if mode == 'rate':
+            nextTime += interval
+            if nextTime < now:
+                # skip the calls that were missed instead of running them back to back
+                nextTime += math.ceil((now - nextTime) / interval) * interval
+        else:
+            nextTime = now + interval
 
-def PrintTimeDiff(tag=None):
-    global lastTime
-    nowTime = time.time()
-    diff = nowTime - lastTime
-    if tag is not None:
-        print('tag={}, TimeDiff={}'.format(tag, round(diff, 2)))
-    else:
-        print('TimeDiff={}'.format(round(diff, 2)))
-    lastTime = nowTime
 
+def aloop(interval, coro, mode='rate', sink=None):
+    '''
+    Calls coro every interval seconds on the running event loop, like Loop()
+    coro can be a coroutine function or a normal function
+    Errors are logged to sink and the loop keeps running.
+
+    task = aloop(5, PollDevice)
+    task.cancel()
+
+    :param interval: float seconds, must be greater than 0
+    :param coro: callable with no args
+    :param mode: str 'rate' (fixed-rate) or 'delay' (fixed-delay), see ScheduledTask
+    :param sink: callable(text, severity), defaults to ProgramLog, or FileLogSink() if extronlib is not available
+    :return: asyncio.Task
+    '''
+    if mode not in ('rate', 'delay'):
+        raise ValueError('mode must be "rate" or "delay"')
+    if not interval > 0:
+        raise ValueError('interval must be greater than 0, not {}'.format(interval))
+    return _asyncio.ensure_future(_ALoop(interval, coro, mode, sink))
+
+
+class _AsyncTraceClient:
+    # The bounded line queue and writer task for one client of an AsyncRemoteTrace
+
+    def __init__(self, writer, bufferSize):
+        self.Writer = writer
+        self.Lines = deque(maxlen=bufferSize)
+        self.Drops = 0
+        self._event = _asyncio.Event()
+        self.Task = _asyncio.ensure_future(self._WriteLoop())
+
+    def Write(self, string):
+        if len(self.Lines) == self.Lines.maxlen:
+            self.Drops += 1
+        self.Lines.append(string)
+        self._event.set()
+
+    async def _WriteLoop(self):
+        while True:
+            await self._event.wait()
+            self._event.clear()
 
-timeItLog = {
-    # 'Func name': float(avgTime)
-}
+            lines = []
+            try:
+                while True:
+                    lines.append(self.Lines.popleft())
+            except IndexError:
+                pass
 
+            try:
+                self.Writer.write(''.join(lines).encode())
+                await self.Writer.drain()  # waits here while the client is slow, new lines keep queueing
+            except _asyncio.CancelledError:
+                raise
+            except ConnectionError as e:
+                # the client is gone, AsyncRemoteTrace._HandleClient removes it when its read ends
+                _DefaultLogSink()('AsyncRemoteTrace client Error: {}\n'.format(e), 'error')
+                self.Lines.clear()
+                self.Writer.close()
+                return
+            except Exception as e:
+                _DefaultLogSink()('AsyncRemoteTrace client Error: {}\n'.format(e), 'error')
+
+
+class AsyncRemoteTrace:
+    '''
+    An asyncio version of RemoteTrace().
+    Each client has a bounded queue and its own writer task that waits for the socket to drain (backpressure).
+    When a queue is full the oldest line is dropped and counted in the client's Drops.
 
-class TimeIt:
-    def __call__(self, func):
-        print('TimeIt.__call__ func={}'.format(func))
+    trace = AsyncRemoteTrace(1024)
+    await trace.Start()
+    print = trace.Print
+    '''
 
-        def NewFunc(*args, **kwargs):
-            startTime = time.time()
-            ret = func(*args, **kwargs)
-            total = time.time() - startTime
-            print('TimeIt: It took {} seconds to execute {}(args={}, kwargs={})'.format(
-                round(total, 2),
-                func.__name__,
-                args,
-                kwargs,
-            ))
-
-            name = '{}.{}'.format(func.__module__, func.__name__)
-            if name not in timeItLog:
-                timeItLog[name] = total
-            else:
-                lastTime = timeItLog[name]
-                avgTime = (lastTime + total) / 2
-                timeItLog[name] = avgTime
+    def __init__(self, IPPort=1024, host='0.0.0.0', bufferSize=1000):
+        self.IPPort = IPPort
+        self.Host = host
+        self.BufferSize = bufferSize
+        self.Clients = {}  # {StreamWriter: _AsyncTraceClient}
+        self._server = None
+
+    async def Start(self):
+        self._server = await _asyncio.start_server(self._HandleClient, self.Host, self.IPPort)
+        if not self.IPPort:
+            # port 0 picks a free port
+            self.IPPort = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def Stop(self):
+        for client in list(self.Clients.values()):
+            client.Task.cancel()
+            client.Writer.close()
+        self.Clients.clear()
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    @property
+    def TotalDrops(self):
+        return sum(client.Drops for client in self.Clients.values())
+
+    async def _HandleClient(self, reader, writer):
+        client = self.Clients[writer] = _AsyncTraceClient(writer, self.BufferSize)
+        try:
+            while await reader.read(1024):
+                pass  # anything the client sends is ignored, this just waits for the disconnect
+        except (ConnectionError, _asyncio.CancelledError):
+            pass
+        finally:
+            self.Clients.pop(writer, None)
+            client.Task.cancel()
+            writer.close()
+
+    def Print(self, *args):
+        # Must be called from the event loop thread, never blocks
+        oldPrint(*args)
+        string = '\r\n' + str(time.monotonic()) + ': ' + ' '.join(str(arg) for arg in args) + '\r\n'
+        for client in self.Clients.values():
+            client.Write(string)
+
+
+async def ARemoteTrace(IPPort=1024, host='0.0.0.0', bufferSize=1000):
+    '''
+    Like RemoteTrace(), for asyncio programs
+    print = await ARemoteTrace()
+    :return: the print function, its AsyncRemoteTrace is available as print.Trace
+    '''
+    trace = await AsyncRemoteTrace(IPPort, host, bufferSize).Start()
 
-            return ret
+    def NewPrint(*args):
+        trace.Print(*args)
 
-        return NewFunc
+    NewPrint.Trace = trace
+    return NewPrint
 
 
-def WriteTimeItFile():
-    with File('TimeIt.log', mode='wt') as file:
-        times = list(timeItLog.values())
-        times.sort()
-        times.reverse()
-        # print('times=', times)
-        sortedTimes = times  # from slowest to fastest
-
-        longestName = None
-        for name in timeItLog.keys():
-            if longestName is None or len(name) > len(longestName):
-                longestName = name
-
-        for t in sortedTimes:
-            name = GetKeyFromValue(timeItLog, t)
-            name = name.rjust(len(longestName), ' ')
-            # print('name=', name)
-            file.write('FunctionName="{}", ExecutionTime= {} seconds\n'.format(name, t))
+class AsyncLogWriter:
+    '''
+    An asyncio version of ProgramLogWriter.
+    Records are queued by Write() and written by a task on the event loop.
+    The sink is called in the default executor so a slow sink does not block the loop.
+    '''
 
+    def __init__(self, sink=None, flushInterval=1, highWaterMark=500):
+        '''
+        :param sink: callable(text, severity), defaults to ProgramLog, or FileLogSink() if extronlib is not available
+        :param flushInterval: float, seconds
+        :param highWaterMark: int, number of queued records that will trigger an immediate flush
+        '''
+        self.Sink = sink or _DefaultLogSink()
+        self.FlushInterval = flushInterval
+        self.HighWaterMark = highWaterMark
+
+        self._records = deque()  # [(text, severity), ...]
+        self._wakeEvent = _asyncio.Event()
+        self._task = _asyncio.ensure_future(self._FlushLoop())
+
+    def Write(self, text, severity='info'):
+        self._records.append((text, severity))
+        if len(self._records) >= self.HighWaterMark:
+            self._wakeEvent.set()
+
+    async def Flush(self):
+        loop = _asyncio.get_event_loop()
+        for text, severity in _CoalesceRecords(self._records):
+            try:
+                await loop.run_in_executor(None, self.Sink, text, severity)
+            except Exception as e:
+                oldPrint('AsyncLogWriter Error:', e)
 
-def Loop(t, func):
-    # Call the func every t seconds, forever
-    @Wait(0)
-    def Loop():
+    async def _FlushLoop(self):
         while True:
-            time.sleep(t)
-            func()
+            try:
+                await _asyncio.wait_for(self._wakeEvent.wait(), self.FlushInterval)
+            except _asyncio.TimeoutError:
+                pass
+            self._wakeEvent.clear()
+            await self.Flush()
+
+    async def Stop(self):
+        # stops the flush task and writes anything that is still queued
+        self._task.cancel()
+        try:
+            await self._task
+        except _asyncio.CancelledError:
+            pass
+        await self.Flush()
+
+
+def APrintProgramLog(sink=None, flushInterval=1, highWaterMark=500):
+    '''
+    Like PrintProgramLog(asynchronous=True), for asyncio programs. Must be called while the event loop is running.
+    print = APrintProgramLog()
+    :return: the print function, its AsyncLogWriter is available as print.Writer
+    '''
+    writer = AsyncLogWriter(sink, flushInterval, highWaterMark)
+    print = _MakeLogPrint(writer.Write)
+    print.Writer = writer
+    return print
 
 
 class PrintFunc:
@@ -667,9 +2510,25 @@ class PrintFunc:
         return NewFunc
 
 
+@functools.lru_cache(maxsize=64)
+def _LocalHourOffset(hourIndex):
+    # the local UTC offset for a whole UTC hour, or None if it changes within the hour (like a DST switch at :30)
+    offset = time.localtime(hourIndex * 3600).tm_gmtoff
+    if time.localtime(hourIndex * 3600 + 3599).tm_gmtoff != offset:
+        return None
+    return offset
+
+
+def _LocalOffsetSeconds(timestamp):
+    # libc is only asked once per hour, except in the hours that have a transition
+    offset = _LocalHourOffset(int(timestamp // 3600))
+    if offset is None:
+        offset = time.localtime(timestamp).tm_gmtoff
+    return offset
+
+
 def GetUTCOffset():
-    offsetSeconds = time.timezone if (time.localtime().tm_isdst == 0) else time.altzone
-    MY_TIME_ZONE = offsetSeconds / 60 / 60 * -1
+    MY_TIME_ZONE = _LocalOffsetSeconds(time.time()) / 60 / 60
     return MY_TIME_ZONE  # returns an int like -5 for EST
 
 
@@ -678,43 +2537,139 @@ def GetTimeZoneName():
     return TZ_NAME
 
 
-def WhatTimeInZone(zone, dt=None):
+# Abbreviations accepted by WhatTimeInZone() and GetZone()
+ZONE_ABBREVIATIONS = {
+    'EST': 'America/New_York',
+    'CST': 'America/Chicago',
+    'MST': 'America/Denver',
+    'PST': 'America/Los_Angeles',
+}
+
+# Standard UTC offset (hours) of ZONE_ABBREVIATIONS, only used if zoneinfo is not available
+_ZONE_STANDARD_OFFSETS = {
+    'EST': -5,
+    'CST': -6,
+    'MST': -7,
+    'PST': -8,
+}
+
+
+@functools.lru_cache(maxsize=64)
+def GetZone(zone):
+    '''
+    :param zone: str IANA name like 'America/New_York', or an abbreviation from ZONE_ABBREVIATIONS like 'EST'
+    :return: zoneinfo.ZoneInfo, or None if zoneinfo is not available on this python
     '''
+    try:
+        from zoneinfo import ZoneInfo
+    except ImportError:
+        try:
+            from backports.zoneinfo import ZoneInfo
+        except ImportError:
+            return None
+
+    return ZoneInfo(ZONE_ABBREVIATIONS.get(zone, zone))
+
+
+def _ZoneOffsetAt(zone, timestamp):
+    tz = GetZone(zone)
+    if tz is None:
+        # no tz database, fall back to the standard offset and the local DST flag
+        return (_ZONE_STANDARD_OFFSETS[zone] + time.localtime(timestamp).tm_isdst) * 3600
+
+    dt = _datetime.datetime.fromtimestamp(timestamp, tz)
+    return int(dt.utcoffset().total_seconds())
+
+
+@functools.lru_cache(maxsize=1024)
+def _ZoneHourOffset(zone, hourIndex):
+    # like _LocalHourOffset(), None if the offset of zone changes within the UTC hour
+    offset = _ZoneOffsetAt(zone, hourIndex * 3600)
+    if _ZoneOffsetAt(zone, hourIndex * 3600 + 3599) != offset:
+        return None
+    return offset
+
+
+def _ZoneOffsetSeconds(zone, timestamp):
+    offset = _ZoneHourOffset(zone, int(timestamp // 3600))
+    if offset is None:
+        offset = _ZoneOffsetAt(zone, timestamp)
+    return offset
+
+
+def GetZoneOffset(zone, timestamp=None):
+    '''
+    :param zone: str like 'America/New_York' or 'EST'
+    :param timestamp: float seconds since the epoch, defaults to now
+    :return: int seconds east of UTC, including DST for that zone at that time
+    '''
+    if timestamp is None:
+        timestamp = time.time()
+    return _ZoneOffsetSeconds(zone, timestamp)
 
-    :param zone: str like 'EST', 'PST', 'CST'
+
+_EPOCH = None
+
+
+def TimestampsToZone(timestamps, zone):
+    '''
+    Converts many epoch timestamps to naive local datetimes in zone.
+    The offset is looked up once per hour of timestamps, not once per item (except in hours with a DST transition).
+    :param timestamps: iterable of float seconds since the epoch
+    :param zone: str like 'America/New_York' or 'EST'
+    :return: list of datetime.datetime
+    '''
+    global _EPOCH
+    if _EPOCH is None:
+        _EPOCH = _datetime.datetime(1970, 1, 1)
+
+    timedelta = _datetime.timedelta
+    ret = []
+    for ts in timestamps:
+        ret.append(_EPOCH + timedelta(seconds=ts + _ZoneOffsetSeconds(zone, ts)))
+    return ret
+
+
+def WhatTimeInZone(zone, dt=None):
+    '''
+    DST is applied using the rules of zone, not the local processor's DST flag.
+    :param zone: str like 'EST', 'PST', 'CST' or an IANA name like 'Europe/London'
+    :param dt: naive datetime in UTC, defaults to now
     :return: datetime
     '''
-    map = {
-        'EST': -5,
-        'CST': -6,
-        'PST': -8,
-    }
     if dt is None:
-        dt = datetime.datetime.utcnow()
-
-    if time.localtime().tm_isdst:
-        dt += datetime.timedelta(hours=1)
+        dt = _datetime.datetime.now(_datetime.timezone.utc).replace(tzinfo=None)
 
-    return dt + datetime.timedelta(hours=map[zone])
+    timestamp = _calendar.timegm(dt.timetuple())
+    return dt + _datetime.timedelta(seconds=GetZoneOffset(zone, timestamp))
 
 
 def pprint(*args):
     # Realized that from pprint import pprint works in GS too :-)
     # This one accepts multiple arguments, so u pick.
-    print('\r\n'.join([json.dumps(item, indent=2) for item in args]))
+    print('\r\n'.join([_json.dumps(item, indent=2) for item in args]))
+
+
+def _SortedUnique(items):
+    # sorted() without duplicates, only needs == and <, so the items do not have to be hashable
+    return [item for item, _ in itertools.groupby(sorted(items))]
+
+
+def IterAllCombos(*lists):
+    '''
+    Lazily yields every combination of one item from each list, sorted and without duplicates
+    Example IterAllCombos(['In1', 'In2'], ['Out1', 'Out2'], ['Zone1'])
+    >>> ('In1', 'Out1', 'Zone1'), ('In1', 'Out2', 'Zone1'), ('In2', 'Out1', 'Zone1'), ('In2', 'Out2', 'Zone1')
+    '''
+    # product() of sorted, de-duplicated lists is already in sorted order
+    return itertools.product(*(_SortedUnique(l) for l in lists))
 
 
 def GetAllCombos(list1, list2):
     # Returns all possible combinations of these two list
     # Example GetAllCombos([1,2,3], [4,5,6])
     # >>> [(1, 4), (1, 5), (1, 6), (2, 4), (2, 5), (2, 6), (3, 4), (3, 5), (3, 6)]
-    ret = []
-    for x in itertools.permutations(list1, len(list2)):
-        for y in zip(x, list2):
-            if y not in ret:
-                ret.append(y)
-    ret.sort()
-    return ret
+    return list(IterAllCombos(list1, list2))
 
 
 def GetOpposite(side):
@@ -743,6 +2698,8 @@ class HashableDict(dict):
     def __eq__(self, other):
         if isinstance(other, HashableDict):
             return self.__key() == other.__key()
+        elif isinstance(other, FrozenHashableDict):
+            return dict.__eq__(self, other)
         else:
             return False
 
@@ -761,6 +2718,90 @@ class HashableDict(dict):
         return HashableDict(retD)
 
 
+def _FrozenError(self, *args, **kwargs):
+    raise TypeError('{} is immutable'.format(type(self).__name__))
+
+
+class FrozenHashableDict(dict):
+    '''
+    An immutable HashableDict.
+    The key and hash are only calculated once, so it is cheap to use as a set member or cache key.
+    Equal to a HashableDict with the same items, and has the same hash.
+    '''
+    __slots__ = ('_key', '_hash')
+
+    def __new__(cls, item={}):
+        if item is None:
+            return None
+        self = super().__new__(cls)
+        self._key = None
+        self._hash = None
+        return self
+
+    def __init__(self, item={}):
+        super().__init__(item)
+
+    def _Key(self):
+        if self._key is None:
+            self._key = tuple((k, self[k]) for k in sorted(self))
+        return self._key
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(self._Key())
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenHashableDict):
+            if self is other:
+                return True
+            if self._hash is not None and other._hash is not None and self._hash != other._hash:
+                return False  # cached hashes are only a shortcut, equal dicts can have unhashable values
+            return dict.__eq__(self, other)
+        elif isinstance(other, HashableDict):
+            return dict.__eq__(self, other)
+        else:
+            return False
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __contains__(self, other):
+        # other is a dict: True if all of its items are in self. Otherwise works like "key in dict"
+        items = getattr(other, 'items', None)
+        if items is None:
+            return dict.__contains__(self, other)
+
+        if len(other) > len(self):
+            return False
+
+        get = self.get
+        for key, value in items():
+            if get(key, _MISSING) != value:
+                return False
+        return True
+
+    def __add__(self, other):
+        # Other will take precedence if duplicate keys in self/other
+        ret = FrozenHashableDict.__new__(FrozenHashableDict)
+        dict.update(ret, self)
+        dict.update(ret, other)
+        return ret
+
+    def __reduce__(self):
+        return (FrozenHashableDict, (dict(self),))
+
+    def __repr__(self):
+        return 'FrozenHashableDict({})'.format(dict.__repr__(self))
+
+    def copy(self):
+        return self
+
+    __setitem__ = __delitem__ = _FrozenError
+    clear = pop = popitem = setdefault = update = _FrozenError
+    __ior__ = _FrozenError
+
+
 def MoveListItem(l, item, units):
     # units is an pos/neg integer (negative it to the left)
     '''
@@ -774,12 +2815,113 @@ def MoveListItem(l, item, units):
     >>> l= ['a', 'b', 'c', 'd', 'e', 'X', 'f', 'g']
 
     '''
-    l = l.copy()
     currentIndex = l.index(item)
-    l.remove(item)
-    l.insert(currentIndex + units, item)
+    rest = l[:currentIndex] + l[currentIndex + 1:]
+    newIndex = _InsertIndex(currentIndex + units, len(rest))
+    return rest[:newIndex] + [item] + rest[newIndex:]
+
+
+def _InsertIndex(index, length):
+    # the index list.insert(index, x) would actually use on a list of this length
+    if index < 0:
+        index = max(0, index + length)
+    return min(index, length)
+
+
+class MovableList:
+    '''
+    A list of unique, hashable items (like presets on a UI page) that keeps an index of where each item is.
+    index(), "in" and finding the item to move are O(1), and Move() only shifts the items between the old and new position,
+        so dragging an item a few places does not copy the whole list like MoveListItem() does.
+
+    l = MovableList(['a', 'b', 'c', 'X', 'd'])
+    l.Move('X', -2)
+    list(l) >>> ['a', 'X', 'b', 'c', 'd']
+    '''
+
+    def __init__(self, items=()):
+        self._items = list(items)
+        self._positions = {}  # {item: int(index)}
+        self._Reindex(0)
+        if len(self._positions) != len(self._items):
+            raise ValueError('MovableList items must be unique')
+
+    def _Reindex(self, start, end=None):
+        items = self._items
+        for index in range(start, len(items) if end is None else end):
+            self._positions[items[index]] = index
+
+    def Move(self, item, units):
+        '''
+        Moves item in place, units is a pos/neg integer (negative is to the left)
+        The new position is the same as MoveListItem(l, item, units) would give.
+        '''
+        currentIndex = self._positions[item]
+        self.MoveTo(item, _InsertIndex(currentIndex + units, len(self._items) - 1))
+
+    def MoveTo(self, item, newIndex):
+        # moves item in place so that it ends up at newIndex
+        items = self._items
+        currentIndex = self._positions[item]
+        newIndex = max(0, min(newIndex, len(items) - 1))
+
+        if newIndex > currentIndex:
+            items[currentIndex:newIndex] = items[currentIndex + 1:newIndex + 1]
+        elif newIndex < currentIndex:
+            items[newIndex + 1:currentIndex + 1] = items[newIndex:currentIndex]
+        else:
+            return
+
+        items[newIndex] = item
+        self._Reindex(min(currentIndex, newIndex), max(currentIndex, newIndex) + 1)
+
+    def index(self, item):
+        try:
+            return self._positions[item]
+        except KeyError:
+            raise ValueError('{} is not in MovableList'.format(item))
+
+    def append(self, item):
+        if item in self._positions:
+            raise ValueError('{} is already in MovableList'.format(item))
+        self._positions[item] = len(self._items)
+        self._items.append(item)
+
+    def insert(self, index, item):
+        if item in self._positions:
+            raise ValueError('{} is already in MovableList'.format(item))
+        index = _InsertIndex(index, len(self._items))
+        self._items.insert(index, item)
+        self._Reindex(index)
+
+    def remove(self, item):
+        index = self.index(item)
+        del self._items[index]
+        del self._positions[item]
+        self._Reindex(index)
+
+    def __contains__(self, item):
+        return item in self._positions
 
-    return l
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __eq__(self, other):
+        if isinstance(other, MovableList):
+            return self._items == other._items
+        return self._items == other
+
+    def ToList(self):
+        return self._items.copy()
+
+    def __repr__(self):
+        return 'MovableList({})'.format(self._items)
 
 
 def ModIndexLoop(num, min_, max_):
@@ -823,6 +2965,25 @@ def ModIndexLoop(num, min_, max_):
     return min_ + mod
 
 
+def ModIndexLoopMany(nums, min_, max_):
+    '''
+    ModIndexLoop() for a whole array of ints in one call
+    Example: ModIndexLoopMany([-4, 0, 4], -3, 3) >>> [3, 0, -3]
+    :param nums: list, array.array or NumPy array of ints
+    :return: the same type as nums (a list for any other iterable)
+    '''
+    maxMinDiff = max_ - min_ + 1  # +1 to include min_
+
+    if hasattr(nums, 'dtype'):
+        # NumPy does the whole array at once
+        return (nums - min_) % maxMinDiff + min_
+
+    values = [(num - min_) % maxMinDiff + min_ for num in nums]
+    if isinstance(nums, array):
+        return array(nums.typecode, values)
+    return values
+
+
 def DecodeLiteral(string):
     return string.decode(encoding='iso-8859-1')
 
@@ -879,70 +3040,80 @@ def _TupleAdd(tup1, tup2):
     return tuple(ret)
 
 
-def _AdjustTimeTuple(tup):
-    # example                          #7
-    # tup = (0, 0, 0, 0, 1, -32, 36, -829)
-    # return (0, 0, 0, 0, 0, 8, 35, 171)
-    ret = list(tup)
+def _DaysInMonth(month, year):
+    return 30 if month in (9, 4, 6, 11) else 31 if month != 2 else 29 if _calendar.isleap(year) else 28
 
-    while ret[7] < 0:  # milis
-        ret[6] -= 1
-        ret[7] += 1000
 
-    while ret[6] < 0:  # seconds
-        ret[5] -= 1
-        ret[6] += 60
+# Time tuples *******************************************************************
+# A time tuple is (year, month, day, weekday, hour, minute, second, milliseconds) like the examples above,
+# weekday is 0 for Monday like datetime.weekday() and is ignored on input.
+# Use these instead of _TupleSubtract() for date math, they handle month and year boundaries.
 
-    while ret[5] < 0:  # min
-        ret[4] -= 1
-        ret[5] += 60
+_EPOCH_ORDINAL = 719163  # datetime.date(1970, 1, 1).toordinal()
 
-    while ret[4] < 0:  # hour
-        ret[2] -= 1
-        ret[4] += 24
 
-    while ret[2] < 0:  # days
-        oldMonth = ret[1]
-        ret[1] -= 1
-        ret[2] += _DaysInMonth(oldMonth, ret[0])
+def _TimeTupleToMS(tup):
+    return (_calendar.timegm((tup[0], tup[1], tup[2], tup[4], tup[5], tup[6])) * 1000) + tup[7]
 
-    while ret[1] < 0:  # month
-        ret[0] -= 1
-        ret[1] += 12
 
-    # ill assume year is > 0
-    return tuple(ret)
+def TimeTupleToSeconds(tup):
+    # (2018, 6, 22, 4, 17, 1, 43, 0) > 1529686903.0 (seconds since the epoch, the tuple is treated as UTC)
+    return _TimeTupleToMS(tup) / 1000
 
 
-def _DaysInMonth(month, year):
-    return 30 if month in (9, 4, 6, 11) else 31 if month != 2 else 29 if year % 4 is 0 else 28
+def SecondsToTimeTuple(seconds):
+    # 1529686903.0 > (2018, 6, 22, 4, 17, 1, 43, 0)
+    days, ms = divmod(int(round(seconds * 1000)), 86400000)
+    date = _datetime.date.fromordinal(_EPOCH_ORDINAL + days)
+    seconds, ms = divmod(ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return date.year, date.month, date.day, date.weekday(), hours, minutes, seconds, ms
+
+
+def TimeTupleToDatetime(tup):
+    return _datetime.datetime(tup[0], tup[1], tup[2], tup[4], tup[5], tup[6], tup[7] * 1000)
+
+
+def DatetimeToTimeTuple(dt):
+    return dt.year, dt.month, dt.day, dt.weekday(), dt.hour, dt.minute, dt.second, dt.microsecond // 1000
+
+
+def TimeTupleDiff(newTup, oldTup):
+    '''
+    Example:
+        newDT = (2018, 6, 22, 4, 17, 1, 43, 0)
+        oldDT = (2018, 6, 22, 4, 16, 33, 7, 829)
+        TimeTupleDiff(newDT, oldDT) >>> 1715.171
+    :return: float seconds from oldTup to newTup
+    '''
+    return (_TimeTupleToMS(newTup) - _TimeTupleToMS(oldTup)) / 1000
 
 
-def _Datetime2seconds(tup):
-    # months with 30 days = [9,4,6,11]
-    # months with 31 days = [1,3,5,7,8,10,12]
-    # feb /leap year
-    daysInMonth = _DaysInMonth(tup[1], tup[0])
-    seconds = 0
-    seconds += tup[0] * 60 * 60 * 24 * 365  # years
-    seconds += tup[1] * 60 * 60 * 24 * daysInMonth  # months
-    seconds += tup[2] * 60 * 60 * 24  # days
-    seconds += tup[4] * 60 * 60  # hours
-    seconds += tup[5] * 60  # minutes
-    seconds += tup[6]
-    seconds += tup[7] / 1000
-    return seconds
+def TimeTupleAddSeconds(tup, seconds):
+    # returns a new time tuple, seconds can be negative
+    return SecondsToTimeTuple(TimeTupleToSeconds(tup) + seconds)
+
+
+def TimeTuplesToSeconds(tups):
+    # Batch version of TimeTupleToSeconds(), returns a list of float
+    return [_TimeTupleToMS(tup) / 1000 for tup in tups]
+
+
+def TimeTupleDiffs(newTups, oldTups):
+    # Batch version of TimeTupleDiff(), returns a list of float seconds
+    return [(_TimeTupleToMS(new) - _TimeTupleToMS(old)) / 1000 for new, old in zip(newTups, oldTups)]
 
 
 def FormatTimeAgo(dt):
     print('58 FormatTimeAgo(', dt)
-    utcNowDt = datetime.datetime.now()
+    utcNowDt = _datetime.datetime.now()
     delta = utcNowDt - dt
     print('61 delta=', delta)
 
-    if delta < datetime.timedelta(days=1):
+    if delta < _datetime.timedelta(days=1):
         print('less than 1 day ago')
-        if delta < datetime.timedelta(hours=1):
+        if delta < _datetime.timedelta(hours=1):
             print('less than 1 hour ago, show "X minutes ago"')
             if delta.total_seconds() < 60:
                 # print('return <1 min ago')
@@ -981,7 +3152,7 @@ def FormatTimeAgo(dt):
 
 
 def IsWeekend(dt=None):
-    dt = dt or datetime.datetime.now()
+    dt = dt or _datetime.datetime.now()
 
     if dt.isoweekday() in (6, 7):
         return True
@@ -1042,14 +3213,165 @@ DANGEROUS_CHARACTERS = {
 }
 
 
+# Device names that Windows will not allow as a filename, even with an extension
+RESERVED_FILENAMES = frozenset(
+    ['CON', 'PRN', 'AUX', 'NUL'] +
+    ['COM{}'.format(i) for i in range(1, 10)] +
+    ['LPT{}'.format(i) for i in range(1, 10)]
+)
+
+
+_CONTROL_CHARACTERS = frozenset(chr(i) for i in range(32)) | {'\x7f'}
+
+
+@functools.lru_cache(maxsize=16)
+def _FilenameTables(characters, replacement):
+    # characters is a frozenset so the tables are only built once for each set
+    # returns (str table, bytes table for ASCII names or None)
+    strTable = str.maketrans({ch: replacement for ch in characters})
+
+    bytesTable = None
+    if len(replacement) == 1 and ord(replacement) < 128:
+        bytesTable = bytes(
+            ord(replacement) if chr(b) in characters else b
+            for b in range(256)
+        )
+    return strTable, bytesTable
+
+
+def _TranslateFilename(name, tables):
+    strTable, bytesTable = tables
+    if bytesTable is not None:
+        # bytes.translate is much faster than str.translate, and most names are ASCII
+        try:
+            return name.encode('ascii').translate(bytesTable).decode('ascii')
+        except UnicodeEncodeError:
+            pass
+    return name.translate(strTable)
+
+
 def secure_filename(name):
-    for ch in DANGEROUS_CHARACTERS:
-        if ch in name:
-            name = name.replace(ch, '_')
-    return name
+    # DANGEROUS_CHARACTERS is read on every call, the tables for each set of characters are cached
+    return _TranslateFilename(name, _FilenameTables(frozenset(DANGEROUS_CHARACTERS), '_'))
+
+
+def _TruncateUTF8(name, maxBytes):
+    # filesystems limit names in bytes, so cut name to maxBytes of UTF-8 without splitting a character
+    if len(name) * 4 <= maxBytes:
+        return name
+    encoded = name.encode('utf-8', 'surrogatepass')
+    if len(encoded) <= maxBytes:
+        return name
+    while maxBytes > 0 and encoded[maxBytes] & 0xC0 == 0x80:
+        maxBytes -= 1  # back up to the first byte of the character that would be cut
+    return encoded[:maxBytes].decode('utf-8', 'surrogatepass')
+
+
+def _SecureFilenameFunc(characters, replacement, normalize, maxLength):
+    # returns a function that does SecureFilename() with these options, so a batch only builds the tables once
+    characters = frozenset(DANGEROUS_CHARACTERS if characters is None else characters) | _CONTROL_CHARACTERS
+    strTable, bytesTable = _FilenameTables(characters, replacement)
+    if normalize:
+        import unicodedata
+        normalizeFunc = unicodedata.normalize
+
+    def Secure(name):
+        asciiName = None
+        if bytesTable is not None:
+            try:
+                asciiName = name.encode('ascii')
+            except UnicodeEncodeError:
+                pass
 
+        if asciiName is not None:
+            name = asciiName.translate(bytesTable).decode('ascii')  # ASCII is already normalized
+        else:
+            if normalize:
+                name = normalizeFunc(normalize, name)
+            name = name.translate(strTable)
+
+        # 'CON.txt' and 'CON ' are reserved too, so compare the part before the first '.'
+        if name.split('.', 1)[0].rstrip(' ').upper() in RESERVED_FILENAMES:
+            name = replacement + name
+
+        if maxLength is not None:
+            name = _TruncateUTF8(name, maxLength)
+
+        return name
+
+    return Secure
+
+
+def SecureFilename(name, characters=None, replacement='_', normalize='NFKC', maxLength=255):
+    '''
+    A stricter secure_filename()
+    Replaces every character in characters (and any control character) in one pass,
+        normalizes unicode, avoids reserved device names like 'CON' and limits the length.
+    Example: SecureFilename('Room 1/Cam:2.jpg') > 'Room_1_Cam_2_jpg'
+    :param name: str
+    :param characters: iterable of str, defaults to DANGEROUS_CHARACTERS
+    :param replacement: str
+    :param normalize: str unicode normal form like 'NFKC', or None to skip
+    :param maxLength: int max length in UTF-8 bytes (the unit filesystems use), None for no limit
+    :return: str
+    '''
+    return _SecureFilenameFunc(characters, replacement, normalize, maxLength)(name)
+
+
+def SecureFilenames(names, unique=False, characters=None, replacement='_', normalize='NFKC', maxLength=255):
+    '''
+    Batch version of SecureFilename()
+    :param names: iterable of str
+    :param unique: bool, if True names that become the same get a '_2', '_3'... suffix (still within maxLength bytes)
+    :return: list of str
+    '''
+    ret = list(map(_SecureFilenameFunc(characters, replacement, normalize, maxLength), names))
+    if unique:
+        seen = set()
+        nextSuffix = {}
+        for index, name in enumerate(ret):
+            newName = name
+            suffix = nextSuffix.get(name, 1)
+            while newName in seen:
+                suffix += 1
+                suffixText = '_{}'.format(suffix)
+                if maxLength is None:
+                    newName = name + suffixText
+                else:
+                    newName = _TruncateUTF8(name, max(0, maxLength - len(suffixText))) + suffixText
+            nextSuffix[name] = suffix
+            seen.add(newName)
+            ret[index] = newName
+    return ret
 
-def sorted_nicely(iterableObj):
+
+_NATURAL_SPLIT = re.compile('([0-9]+)')
+
+
+def NaturalSortKey(text):
+    '''
+    Returns a key that sorts numbers inside the text by value
+    'Room 10' > ('Room ', 10, '')
+    The parts always alternate str, int, str... so any two keys can be compared.
+    '''
+    if not isinstance(text, str):
+        text = str(text)
+    parts = _NATURAL_SPLIT.split(text)
+    parts[1::2] = map(int, parts[1::2])
+    return tuple(parts)
+
+
+_NaturalSortKeyCached = functools.lru_cache(maxsize=65536)(NaturalSortKey)
+
+
+def _NaturalKeyFunc(key, cache):
+    naturalKey = _NaturalSortKeyCached if cache else NaturalSortKey
+    if key is None:
+        return naturalKey
+    return lambda item: naturalKey(key(item))
+
+
+def sorted_nicely(iterableObj, key=None, reverse=False, cache=False):
     """ Sorts the given iterable list alphabetical including numberical values
 
     The default list.sort() will sort thing like this:
@@ -1067,8 +3389,22 @@ def sorted_nicely(iterableObj):
     Required arguments:
     iterableObj -- The iterable to be sorted.
 
+    Optional arguments:
+    key -- function that returns the text to sort each item by, like sorted()
+    reverse -- like sorted()
+    cache -- if True, the keys are kept in an LRU cache so re-sorting the same text is faster
+
+    """
+    return sorted(iterableObj, key=_NaturalKeyFunc(key, cache), reverse=reverse)
+
 
+def nsmallest_nicely(n, iterableObj, key=None, cache=False):
+    """ Returns the first n items that sorted_nicely() would return, without sorting everything.
+    Useful when a UI page only shows the first n items.
     """
-    convert = lambda text: int(text) if text.isdigit() else text
-    alphanum_key = lambda key: [convert(c) for c in re.split('([0-9]+)', key)]
-    return sorted(iterableObj, key=alphanum_key)
+    return heapq.nsmallest(n, iterableObj, key=_NaturalKeyFunc(key, cache))
+
+
+if sys.version_info < (3, 7):
+    # no module __getattr__, so resolve the lazy public names now
+    __all__ = __getattr__('__all__')
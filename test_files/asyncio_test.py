@@ -0,0 +1,92 @@
+import asyncio
+import time
+import gs_tools
+from gs_tools import aloop, ARemoteTrace, APrintProgramLog
+
+gs_tools.oldPrint = lambda *a, **k: None
+
+
+async def TestALoop():
+    calls = []
+
+    async def Poll():
+        calls.append(asyncio.get_event_loop().time())
+        await asyncio.sleep(0.02)
+
+    start = asyncio.get_event_loop().time()
+    task = aloop(0.05, Poll)
+    await asyncio.sleep(0.52)
+    task.cancel()
+    await asyncio.sleep(0.1)
+    print('aloop calls=', len(calls), 'last offset=', round(calls[-1] - start, 3))
+    # missed grid points are skipped, so a loaded machine can see fewer calls, but they stay on the 0.05 s grid
+    assert 5 <= len(calls) <= 11
+    lateness = sorted((t - start) % 0.05 for t in calls)
+    assert lateness[len(lateness) // 2] < 0.015, 'aloop drifted'
+
+
+async def TestRemoteTrace():
+    print_ = await ARemoteTrace(0, '127.0.0.1', bufferSize=1000)
+    trace = print_.Trace
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', trace.IPPort)
+    stalledReader, stalledWriter = await asyncio.open_connection('127.0.0.1', trace.IPPort)  # never read from
+    await asyncio.sleep(0.05)
+    assert len(trace.Clients) == 2
+
+    received = []
+
+    async def Read():
+        while True:
+            data = await reader.read(1 << 20)
+            if not data:
+                break
+            received.append(data)
+
+    readTask = asyncio.ensure_future(Read())
+
+    N = 40000
+    worst = 0
+    for i in range(N):
+        t = time.perf_counter()
+        print_('line', i, 'x' * 1000)
+        worst = max(worst, time.perf_counter() - t)
+        if i % 200 == 0:
+            await asyncio.sleep(0.001)
+
+    await asyncio.sleep(0.2)
+    assert 'line {} '.format(N - 1).encode() in b''.join(received)
+
+    stalledPort = stalledWriter.get_extra_info('sockname')[1]
+    drops = {c.Writer.get_extra_info('peername')[1] == stalledPort: c.Drops for c in trace.Clients.values()}
+    print('trace worst caller latency={:.1f}us drops={}'.format(worst * 1e6, drops))
+    assert drops[True] > 0
+    assert drops[False] == 0
+
+    writer.close()
+    await asyncio.sleep(0.05)
+    readTask.cancel()
+    assert len(trace.Clients) == 1
+    stalledWriter.close()
+    await trace.Stop()
+
+
+async def TestLogWriter():
+    written = []
+    print_ = APrintProgramLog(sink=lambda text, severity: written.append((text, severity)), highWaterMark=3)
+    print_('a')
+    print_('b')
+    print_('c', severity='error')
+    await asyncio.sleep(0.1)
+    print_('d')
+    await print_.Writer.Stop()
+    print('log writes=', written)
+    assert written == [('a\nb\n', 'info'), ('c\n', 'error'), ('d\n', 'info')]
+
+
+loop = asyncio.new_event_loop()
+asyncio.set_event_loop(loop)
+loop.run_until_complete(TestALoop())
+loop.run_until_complete(TestRemoteTrace())
+loop.run_until_complete(TestLogWriter())
+loop.close()
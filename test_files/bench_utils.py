@@ -0,0 +1,23 @@
+import time
+
+# Shared helpers for the *_bench.py scripts in this folder
+
+
+def Bench(name, func, count=None, unit='items'):
+    '''
+    Calls func once and prints how long it took
+    :param name: str, the label printed in front of the time
+    :param func: callable with no args
+    :param count: int, if given the rate (count per second) is printed too
+    :param unit: str, the name of what count counts
+    :return: whatever func returned
+    '''
+    start = time.perf_counter()
+    ret = func()
+    total = time.perf_counter() - start
+
+    line = '{:<40} {:.4f} seconds'.format(name, total)
+    if count is not None:
+        line += ' ({:.0f} {}/second)'.format(count / total, unit)
+    print(line)
+    return ret
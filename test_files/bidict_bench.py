@@ -0,0 +1,47 @@
+import copy
+import pickle
+import time
+from gs_tools import BiDict, GetKeyFromValue
+
+N = 10000
+LOOKUPS = 2000
+
+d = {'Output{}'.format(i): i for i in range(N)}
+b = BiDict(d)
+values = list(range(0, N, N // LOOKUPS))
+
+start = time.perf_counter()
+a = [GetKeyFromValue(d, v) for v in values]
+linear = time.perf_counter() - start
+
+start = time.perf_counter()
+c = [b.GetKey(v) for v in values]
+indexed = time.perf_counter() - start
+
+assert a == c
+print('GetKeyFromValue: {} lookups on {} entries took {:.4f} seconds'.format(len(values), N, linear))
+print('BiDict.GetKey:   {} lookups on {} entries took {:.4f} seconds ({:.0f}x faster)'.format(
+    len(values), N, indexed, linear / indexed))
+
+# the reverse index stays in sync on every way of updating or copying
+b = BiDict({'a': 1, 'b': 2})
+b |= {'c': 3}
+assert b.GetKey(3) == 'c'
+
+b2 = copy.copy(b)
+b2['z'] = 1
+assert b.GetKeys(1) == ['a'] and b2.GetKeys(1) == ['a', 'z']
+
+for b3 in (copy.deepcopy(b), pickle.loads(pickle.dumps(b))):
+    b3['y'] = 2
+    assert type(b3) is BiDict and b3.GetKeys(2) == ['b', 'y'] and b.GetKeys(2) == ['b']
+
+# a failed set (unhashable value) leaves the BiDict unchanged
+b = BiDict({'a': 1})
+try:
+    b['z'] = [1]
+except TypeError:
+    pass
+assert 'z' not in b and b.GetKey(1) == 'a'
+b['z'] = 2
+del b['z']
@@ -0,0 +1,63 @@
+import binascii
+import random
+from gs_tools import (
+    StringToBytes, BytesToString, MacStringToMacBytes, MacBytesToMacString, MACFormat, PackMACs, UnpackMACs,
+)
+from bench_utils import Bench
+
+
+# the implementations these replaced
+def OldStringToBytes(text):
+    return bytes(list(ord(c) for c in text))
+
+
+def OldBytesToString(binary):
+    return "".join(chr(b) for b in binary)
+
+
+def OldMacStringToMacBytes(macString):
+    macString = MACFormat(macString)
+    m = [octet for octet in macString.split('-')]
+    ret = [bytes.fromhex(item) for item in m]
+    ret = b''.join(ret)
+    return ret
+
+
+def OldMacBytesToMacString(macBytes):
+    macBytesHex = binascii.hexlify(macBytes)
+    macString = macBytesHex.decode()
+    return MACFormat(macString)
+
+
+N = 100000
+frame = 'GET /status HTTP/1.1\r\nHost: 192.168.254.254\r\n\r\n' * 4
+frameBytes = frame.encode()
+macs = ['{:012X}'.format(random.getrandbits(48)) for _ in range(N)]
+macBytes = [bytes.fromhex(m) for m in macs]
+
+
+a = Bench('old StringToBytes x{}'.format(N), lambda: [OldStringToBytes(frame) for _ in range(N)])
+b = Bench('StringToBytes x{}'.format(N), lambda: [StringToBytes(frame) for _ in range(N)])
+assert a == b
+
+a = Bench('old BytesToString x{}'.format(N), lambda: [OldBytesToString(frameBytes) for _ in range(N)])
+b = Bench('BytesToString x{}'.format(N), lambda: [BytesToString(frameBytes) for _ in range(N)])
+assert a == b
+
+a = Bench('old MacStringToMacBytes x{}'.format(N), lambda: [OldMacStringToMacBytes(m) for m in macs])
+b = Bench('MacStringToMacBytes x{}'.format(N), lambda: [MacStringToMacBytes(m) for m in macs])
+c = Bench('PackMACs', lambda: PackMACs(macs))
+assert a == b and b''.join(a) == c
+
+a = Bench('old MacBytesToMacString x{}'.format(N), lambda: [OldMacBytesToMacString(m) for m in macBytes])
+b = Bench('MacBytesToMacString x{}'.format(N), lambda: [MacBytesToMacString(m) for m in macBytes])
+d = Bench('UnpackMACs', lambda: UnpackMACs(c))
+assert a == b == d
+
+# an over-long MAC is rejected instead of shifting every MAC after it in the buffer
+for func in (lambda: PackMACs(['aabbccddeeff00', '112233445566']), lambda: MacStringToMacBytes('aabbccddeeff00')):
+    try:
+        func()
+        raise AssertionError('over-long MAC was accepted')
+    except ValueError:
+        pass
@@ -0,0 +1,39 @@
+import itertools
+import time
+from gs_tools import GetAllCombos, IterAllCombos
+
+
+def OldGetAllCombos(list1, list2):
+    # the implementation this replaced
+    ret = []
+    for x in itertools.permutations(list1, len(list2)):
+        for y in zip(x, list2):
+            if y not in ret:
+                ret.append(y)
+    ret.sort()
+    return ret
+
+
+for n in range(2, 9):
+    inputs = ['In{}'.format(i) for i in range(n)]
+    outputs = ['Out{}'.format(i) for i in range(n)]
+
+    start = time.perf_counter()
+    a = OldGetAllCombos(inputs, outputs)
+    old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    b = GetAllCombos(inputs, outputs)
+    new = time.perf_counter() - start
+
+    assert a == b
+    print('n={}: old {:.5f} seconds, new {:.5f} seconds'.format(n, old, new))
+
+for n in (10, 100, 1000):
+    start = time.perf_counter()
+    count = len(GetAllCombos(range(n), range(n)))
+    print('n={}: {} pairs in {:.5f} seconds'.format(n, count, time.perf_counter() - start))
+
+start = time.perf_counter()
+count = sum(1 for _ in IterAllCombos(range(64), range(64), range(16)))
+print('64 inputs x 64 outputs x 16 zones: {} combos in {:.3f} seconds'.format(count, time.perf_counter() - start))
@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+# Measures the cold import time of gs_tools in a fresh interpreter,
+# with and without (stand-in) extronlib hardware libraries on the path
+
+RUNS = 10
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CODE = '''
+import time
+start = time.perf_counter()
+import gs_tools
+print(time.perf_counter() - start)
+'''
+
+FAKE_EXTRONLIB = {
+    'extronlib/__init__.py': 'def event(*a, **k):\n    return lambda func: func\n',
+    'extronlib/system.py': 'def ProgramLog(*a, **k): pass\nclass File: pass\nclass Wait: pass\n',
+    'extronlib/interface.py': 'class EthernetServerInterfaceEx: pass\n',
+}
+
+
+def ImportTime(extraPath=None):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in (PACKAGE_DIR, extraPath) if p)
+    times = []
+    for _ in range(RUNS):
+        out = subprocess.check_output([sys.executable, '-W', 'ignore', '-c', CODE], env=env)
+        times.append(float(out))
+    return min(times)
+
+
+print('without extronlib: {:.2f} ms'.format(ImportTime() * 1000))
+
+with tempfile.TemporaryDirectory() as tempDir:
+    for path, text in FAKE_EXTRONLIB.items():
+        os.makedirs(os.path.join(tempDir, os.path.dirname(path)), exist_ok=True)
+        with open(os.path.join(tempDir, path), 'w') as file:
+            file.write(text)
+
+    print('with extronlib:    {:.2f} ms'.format(ImportTime(tempDir) * 1000))
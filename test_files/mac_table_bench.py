@@ -0,0 +1,60 @@
+import csv
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from gs_tools import MacTable, MACFormat
+
+N = 200000
+macs = ['{:012x}'.format(random.getrandbits(48)) for _ in range(N)]
+colonMacs = [':'.join(m[i:i + 2] for i in range(0, 12, 2)) for m in macs]
+
+
+def Measure(name, build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print('{:<36} {:.3f} seconds, {:.1f} MB'.format(name, elapsed, size / 1e6))
+    return obj
+
+
+d = Measure('dict of MACFormat() strings', lambda: {MACFormat(m): i for i, m in enumerate(macs)})
+t = Measure('MacTable', lambda: MacTable((m, i) for i, m in enumerate(macs)))
+assert len(d) == len(t)
+
+start = time.perf_counter()
+assert all(MACFormat(m) in d for m in colonMacs)
+print('dict lookups (via MACFormat)          {:.3f} seconds'.format(time.perf_counter() - start))
+
+start = time.perf_counter()
+assert all(m in t for m in colonMacs)
+print('MacTable lookups                      {:.3f} seconds'.format(time.perf_counter() - start))
+
+assert t[macs[5].upper()] == t[bytes.fromhex(macs[5])] == 5
+
+with tempfile.TemporaryDirectory() as tempDir:
+    path = os.path.join(tempDir, 'inventory.csv')
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Name', 'MAC'])
+        for i, m in enumerate(colonMacs):
+            writer.writerow(['Device {}'.format(i), m])
+
+    table = MacTable()
+    start = time.perf_counter()
+    count = table.LoadCSV(path, macColumn='MAC', valueColumn='Name')
+    print('LoadCSV {} rows                   {:.3f} seconds'.format(count, time.perf_counter() - start))
+    assert table[macs[7]] == 'Device 7'
+
+# anything that is not exactly 12 hex digits, 6 bytes or a 48-bit int is rejected
+for bad in ['hello world', 'aa:bb:cc:dd:ee:ff:00', b'\x00' * 7, 1 << 48]:
+    try:
+        MacTable()[bad] = 1
+        raise AssertionError('{} was accepted'.format(bad))
+    except ValueError:
+        pass
+assert 'hello world' not in t
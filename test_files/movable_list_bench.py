@@ -0,0 +1,15 @@
+import timeit
+from array import array
+
+import gs_tools
+from gs_tools import MoveListItem, MovableList, ModIndexLoop, ModIndexLoopMany
+
+items = ['preset{}'.format(i) for i in range(2000)]
+ml = MovableList(items)
+
+gs_tools.oldPrint('MoveListItem x1000 =', timeit.timeit(lambda: MoveListItem(items, 'preset1000', 2), number=1000))
+gs_tools.oldPrint('MovableList.Move x1000 =', timeit.timeit(lambda: ml.Move('preset1000', 2), number=1000))
+
+nums = array('l', range(-50000, 50000))
+gs_tools.oldPrint('ModIndexLoop loop =', timeit.timeit(lambda: [ModIndexLoop(n, -3, 3) for n in nums], number=10))
+gs_tools.oldPrint('ModIndexLoopMany =', timeit.timeit(lambda: ModIndexLoopMany(nums, -3, 3), number=10))
@@ -0,0 +1,67 @@
+import socket
+import time
+import gs_tools
+
+
+class FakeClient:
+    # Stand-in for the ClientObject from EthernetServerInterfaceEx, backed by a local socket pair
+    def __init__(self, name):
+        self.IPAddress = name
+        self.ServicePort = 1024
+        self.sock, self.peer = socket.socketpair()
+
+    def Send(self, data):
+        self.sock.sendall(data.encode())
+
+
+class FakeServer:
+    # Stand-in for EthernetServerInterfaceEx
+    def __init__(self, IPPort):
+        self.IPPort = IPPort
+        self.Clients = []
+
+    def StartListen(self):
+        return 'Listening'
+
+
+gs_tools._EthernetServerInterfaceEx = FakeServer
+gs_tools._event = lambda *a, **k: (lambda func: func)
+gs_tools._ProgramLog = lambda *a, **k: None
+gs_tools.oldPrint = lambda *a, **k: None
+
+print_ = gs_tools.RemoteTrace(buffered=True, bufferSize=1000, flushInterval=0.005)
+
+good = FakeClient('good')
+stalled = FakeClient('stalled')  # nobody ever reads stalled.peer, so its socket buffer fills up and Send() blocks
+gs_tools.RemoteTraceServer.Clients.extend([good, stalled])
+
+good.peer.setblocking(False)
+received = b''
+
+N = 20000
+worst = 0
+start = time.perf_counter()
+for i in range(N):
+    t = time.perf_counter()
+    print_('line', i, 'x' * 200)
+    worst = max(worst, time.perf_counter() - t)
+
+    if i % 500 == 0:
+        total = time.perf_counter() - start
+        time.sleep(0.02)  # give the flusher threads time to run
+        start = time.perf_counter() - total
+
+        try:
+            while True:
+                received += good.peer.recv(1 << 20)
+        except BlockingIOError:
+            pass
+
+total = time.perf_counter() - start
+print('caller latency: avg={:.2f}us, worst={:.2f}us'.format(total / N * 1e6, worst * 1e6))
+print('drops=', dict((c.IPAddress, n) for c, n in gs_tools.RemoteTraceBuffer.Drops.items()))
+
+assert worst < 0.05, 'caller was stalled by a slow client'
+assert gs_tools.RemoteTraceBuffer.Drops[stalled] > 0
+assert gs_tools.RemoteTraceBuffer.Drops[good] < gs_tools.RemoteTraceBuffer.Drops[stalled]
+assert received.count(b'line') > N / 2
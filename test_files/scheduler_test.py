@@ -0,0 +1,85 @@
+import threading
+import time
+from gs_tools import Loop, Scheduler
+
+# fixed-rate loops should not drift even when the function takes a while
+calls = []
+
+
+def SlowFunc():
+    calls.append(time.monotonic())
+    time.sleep(0.02)
+
+
+start = time.monotonic()
+task = Loop(0.05, SlowFunc)
+time.sleep(0.52)
+task.Cancel()
+print('rate calls=', len(calls), 'offsets=', [round(t - start, 3) for t in calls])
+# every grid point is either run or counted as skipped, and runs stay on the 0.05 s grid instead of drifting
+assert task.Runs == len(calls) and abs(task.Runs + task.Skipped - 10) <= 1, task
+lateness = sorted((t - start) % 0.05 for t in calls)
+assert lateness[len(lateness) // 2] < 0.015, 'loop drifted'
+
+time.sleep(0.1)
+assert task.Runs == len(calls), 'cancelled task was called'
+
+# errors are logged to the scheduler's sink and the task keeps running
+errors = []
+errorScheduler = Scheduler(sink=lambda text, severity: errors.append(severity))
+errorTask = errorScheduler.Every(0.01, lambda: 1 / 0)
+time.sleep(0.1)
+errorTask.Cancel()
+errorScheduler.Stop()
+assert errorTask.Runs > 1 and errors.count('error') == errorTask.Runs
+
+# bad intervals are rejected up front, and a sink that raises does not stop the other tasks
+for badInterval, badJitter in ((0, 0), (-1, 0), (0.01, -1)):
+    try:
+        Loop(badInterval, lambda: None, jitter=badJitter)
+        raise AssertionError('interval={} jitter={} was accepted'.format(badInterval, badJitter))
+    except ValueError:
+        pass
+
+
+def BadSink(text, severity):
+    raise OSError('read-only directory')
+
+
+sinkScheduler = Scheduler(sink=BadSink)
+healthy = sinkScheduler.Every(0.01, lambda: None)
+failing = sinkScheduler.Every(0.01, lambda: 1 / 0)
+time.sleep(0.1)
+runs = healthy.Runs
+time.sleep(0.05)
+assert healthy.Runs > runs and failing.Runs > 1, (healthy, failing)
+sinkScheduler.Stop()
+
+# overruns are counted and missed calls are skipped, not bunched up
+scheduler = Scheduler()
+overrun = scheduler.Every(0.02, lambda: time.sleep(0.05))
+time.sleep(0.3)
+overrun.Cancel()
+print(overrun)
+assert overrun.Overruns > 0 and overrun.Skipped > 0
+
+# fixed-delay
+delayCalls = []
+delayTask = scheduler.Every(0.05, lambda: (delayCalls.append(time.monotonic()), time.sleep(0.02)), mode='delay')
+time.sleep(0.3)
+delayTask.Cancel()
+gaps = [b - a for a, b in zip(delayCalls, delayCalls[1:])]
+print('delay gaps=', [round(g, 3) for g in gaps])
+assert all(g >= 0.069 for g in gaps)
+
+# 50 loops, one thread
+before = threading.active_count()
+counts = [0] * 50
+tasks = [scheduler.Every(0.01, lambda i=i: counts.__setitem__(i, counts[i] + 1), jitter=0.005) for i in range(50)]
+time.sleep(0.2)
+for t in tasks:
+    t.Cancel()
+print('threads added=', threading.active_count() - before, 'min calls=', min(counts))
+assert threading.active_count() == before
+assert min(counts) > 5
+scheduler.Stop()
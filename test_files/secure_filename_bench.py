@@ -0,0 +1,38 @@
+import random
+import string
+from gs_tools import secure_filename, SecureFilename, SecureFilenames, DANGEROUS_CHARACTERS
+from bench_utils import Bench
+
+
+def OldSecureFilename(name):
+    # the implementation this replaced
+    for ch in DANGEROUS_CHARACTERS:
+        if ch in name:
+            name = name.replace(ch, '_')
+    return name
+
+
+N = 200000
+alphabet = string.ascii_letters + string.digits + ''.join(DANGEROUS_CHARACTERS)
+names = [''.join(random.choice(alphabet) for _ in range(40)) for _ in range(N)]
+
+
+a = Bench('old secure_filename x{}'.format(N), lambda: [OldSecureFilename(n) for n in names])
+b = Bench('secure_filename x{}'.format(N), lambda: [secure_filename(n) for n in names])
+assert a == b
+Bench('SecureFilenames (NFKC, limits)', lambda: SecureFilenames(names))
+
+# reserved device names are caught with an extension too, and unique suffixes stay within maxLength
+assert SecureFilename('CON.txt', characters='/\\') == '_CON.txt'
+assert SecureFilename('con ', characters='/\\') == '_con '
+unique = SecureFilenames(['a' * 10] * 12, unique=True, maxLength=10)
+assert len(set(unique)) == 12 and max(map(len, unique)) == 10
+
+# maxLength counts UTF-8 bytes, the unit filesystems limit names by
+assert len(SecureFilename('日本' * 200).encode()) == 255
+assert all(len(name.encode()) <= 255 for name in SecureFilenames(['日本' * 200] * 3, unique=True))
+
+# changes to DANGEROUS_CHARACTERS are used on the next call
+DANGEROUS_CHARACTERS.add('x')
+assert secure_filename('xyz') == '_yz'
+DANGEROUS_CHARACTERS.discard('x')
@@ -0,0 +1,64 @@
+import calendar
+import datetime
+import random
+from gs_tools import (
+    TimeTupleToSeconds, SecondsToTimeTuple, TimeTupleToDatetime, DatetimeToTimeTuple,
+    TimeTupleDiff, TimeTupleAddSeconds, TimeTuplesToSeconds, TimeTupleDiffs, _DaysInMonth,
+    GetZone, GetZoneOffset,
+)
+
+# Property checks against datetime on random inputs
+
+EPOCH = datetime.datetime(1970, 1, 1)
+random.seed(1234)
+
+
+def RandomDatetime():
+    seconds = random.randint(-2208988800, 4102444800)  # 1900 thru 2100
+    return EPOCH + datetime.timedelta(seconds=seconds, milliseconds=random.randint(0, 999))
+
+
+def Seconds(dt):
+    return (dt - EPOCH) / datetime.timedelta(seconds=1)
+
+
+assert TimeTupleDiff((2018, 6, 22, 4, 17, 1, 43, 0), (2018, 6, 22, 4, 16, 33, 7, 829)) == 1715.171
+
+for _ in range(20000):
+    dt1 = RandomDatetime()
+    dt2 = RandomDatetime()
+    tup1 = DatetimeToTimeTuple(dt1)
+    tup2 = DatetimeToTimeTuple(dt2)
+
+    # round trips
+    assert TimeTupleToDatetime(tup1) == dt1
+    assert SecondsToTimeTuple(TimeTupleToSeconds(tup1)) == tup1, tup1
+    assert abs(TimeTupleToSeconds(tup1) - Seconds(dt1)) < 1e-6
+
+    # differences match timedelta, including across month/year/leap boundaries
+    assert abs(TimeTupleDiff(tup1, tup2) - (dt1 - dt2).total_seconds()) < 1e-6
+
+    # adding seconds matches datetime + timedelta
+    delta = random.randint(-10 ** 8, 10 ** 8) + random.randint(0, 999) / 1000
+    expected = dt1 + datetime.timedelta(seconds=delta)
+    assert TimeTupleAddSeconds(tup1, delta) == DatetimeToTimeTuple(expected), (tup1, delta)
+
+# batch versions match the single versions
+tups = [DatetimeToTimeTuple(RandomDatetime()) for _ in range(1000)]
+olds = [DatetimeToTimeTuple(RandomDatetime()) for _ in range(1000)]
+assert TimeTuplesToSeconds(tups) == [TimeTupleToSeconds(t) for t in tups]
+assert TimeTupleDiffs(tups, olds) == [TimeTupleDiff(a, b) for a, b in zip(tups, olds)]
+
+# _DaysInMonth follows the century leap year rules
+for year in range(1800, 2401):
+    for month in range(1, 13):
+        assert _DaysInMonth(month, year) == calendar.monthrange(year, month)[1], (year, month)
+
+# zones that switch DST at :30 past a UTC hour get the right offset on both sides of the switch
+if GetZone('America/St_Johns') is not None:
+    for minute in range(0, 60, 5):
+        ts = calendar.timegm((2024, 3, 10, 5, minute, 0))
+        expected = datetime.datetime.fromtimestamp(ts, GetZone('America/St_Johns')).utcoffset().total_seconds()
+        assert GetZoneOffset('America/St_Johns', ts) == expected, minute
+
+print('ok')
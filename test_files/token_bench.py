@@ -0,0 +1,22 @@
+import random
+from gs_tools import GetRandomToken, GetRandomTokens, GetRandomHex
+from bench_utils import Bench
+
+
+def OldGetRandomPassword(length=512):
+    # the implementation this replaced
+    pw = ''
+    for i in range(length):
+        ch = random.choice(['1', '2', '3', '4', '5', '6', '7', '8', '9', '0',
+                            'a', 'b', 'c', 'd', 'f'])
+        pw += ch
+    return pw
+
+
+N = 2000
+
+
+Bench('old GetRandomPassword(512) x{}'.format(N), lambda: [OldGetRandomPassword() for _ in range(N)], count=N, unit='tokens')
+Bench('GetRandomToken(512) x{}'.format(N), lambda: [GetRandomToken(512) for _ in range(N)], count=N, unit='tokens')
+Bench('GetRandomTokens({}, 512)'.format(N), lambda: GetRandomTokens(N, 512), count=N, unit='tokens')
+Bench('GetRandomHex(128) x{}'.format(N), lambda: [GetRandomHex(128) for _ in range(N)], count=N, unit='tokens')
@@ -0,0 +1,19 @@
+from urllib.parse import unquote
+from gs_tools import Unquote, UnquoteMany
+from bench_utils import Bench
+
+N = 100000
+queries = [
+    'room%3D{}%26source%3DLaptop%20{}%26name%3DCaf%C3%A9%20%E2%82%AC{}'.format(i, i % 7, i)
+    for i in range(N)
+]
+
+
+a = Bench('urllib.parse.unquote x{}'.format(N), lambda: [unquote(q) for q in queries])
+b = Bench('Unquote x{}'.format(N), lambda: [Unquote(q) for q in queries])
+c = Bench('UnquoteMany', lambda: UnquoteMany(queries))
+assert a == b == c
+
+# literal text that the encoding cannot represent is kept as is, like urllib
+for text in ['€%20', 'caf%E9 €', '%E2%82%AC€%41']:
+    assert Unquote(text, encoding='latin-1') == unquote(text, encoding='latin-1'), text
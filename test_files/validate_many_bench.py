@@ -0,0 +1,27 @@
+import random
+from gs_tools import (
+    IsValidIPv4, ValidateIPv4Many,
+    IsValidMACAddress, ValidateMACMany,
+    MACFormat, MACFormatMany,
+)
+from bench_utils import Bench
+
+N = 1000000
+
+ips = ['{}.{}.{}.{}'.format(*(random.randint(0, 300) for _ in range(4))) for _ in range(N)]
+# inputs that int() accepts but are not valid octets
+ips += ['1.2.3.0001', ' 1.2.3.4', '1.2.3.4 ', '+1.2.3.4', '1.2.3.1_0', '1.2.3', '1.2.3.4.5', '1.2.3.04', '']
+macs = ['{:012x}'.format(random.getrandbits(48)) for _ in range(N)]
+
+
+a = Bench('IsValidIPv4 x{}'.format(N), lambda: [IsValidIPv4(ip) for ip in ips])
+b = Bench('ValidateIPv4Many', lambda: ValidateIPv4Many(ips))
+assert a == b
+
+a = Bench('IsValidMACAddress x{}'.format(N), lambda: [IsValidMACAddress(m) for m in macs])
+b = Bench('ValidateMACMany', lambda: ValidateMACMany(macs))
+assert a == b
+
+a = Bench('MACFormat x{}'.format(N), lambda: [MACFormat(m) for m in macs])
+b = Bench('MACFormatMany', lambda: MACFormatMany(macs))
+assert a == b